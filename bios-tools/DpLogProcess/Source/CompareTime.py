@@ -1,6 +1,14 @@
-import pandas as pd
 import sys
 import os
+import math
+import heapq
+import pickle
+import tempfile
+import contextlib
+from itertools import islice
+from operator import itemgetter
+
+from DpRecords import SECTION_KEYS, SECTION_VALUES
 
 def check_python_version():
     """Check if the script is running with Python 3."""
@@ -18,230 +26,479 @@ def save_as_markdown(df, output_file):
     with open(output_file, 'w') as f:
         f.write(df.to_markdown(index=False))
 
-def compare_major_files(file1, file2, output_file=None):
-    # Read the two Markdown files and convert them to DataFrames
-    df1 = pd.read_csv(file1, delimiter='|', skipinitialspace=True, engine='python', header=0, skiprows=[1])
-    df2 = pd.read_csv(file2, delimiter='|', skipinitialspace=True, engine='python', header=0, skiprows=[1])
+def read_md_table(file):
+    """Read a Markdown table written by ProcessData into a DataFrame."""
+    import pandas as pd
+
+    df = pd.read_csv(file, delimiter='|', skipinitialspace=True, header=0, skiprows=[1])
 
     # Remove extra columns that may have been misread
-    df1 = df1.loc[:, ~df1.columns.str.contains('^Unnamed')]
-    df2 = df2.loc[:, ~df2.columns.str.contains('^Unnamed')]
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
 
-    # Clean column names
-    df1 = clean_column_names(df1)
-    df2 = clean_column_names(df2)
+    # Clean column names and the trailing padding of text cells
+    df = clean_column_names(df)
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].str.strip()
+    return df
 
-    # Check if the required columns exist
-    required_columns = ['Phase', 'Duration (us)']
-    for col in required_columns:
-        if col not in df1.columns:
-            print(f"Column {col} is missing in file1")
-        if col not in df2.columns:
-            print(f"Column {col} is missing in file2")
-    
-    # Convert the Duration (us) columns to integer type
-    df1['Duration (us)'] = df1['Duration (us)'].astype(int)
-    df2['Duration (us)'] = df2['Duration (us)'].astype(int)
-    
-    # Extract file names without extensions for clearer column names
-    file1_name = os.path.splitext(os.path.basename(file1))[0]
-    file2_name = os.path.splitext(os.path.basename(file2))[0]
-    
-    # Merge the two DataFrames on Phase
-    df_merged = pd.merge(df1, df2, on='Phase', suffixes=(f'_{file1_name}', f'_{file2_name}'))
-    
-    # Rename columns for clarity
-    df_merged.rename(columns={
-        f'Duration (us)_{file1_name}': f'{file1_name} Duration (us)',
-        f'Duration (us)_{file2_name}': f'{file2_name} Duration (us)'
-    }, inplace=True)
-    
-    # Calculate the difference and add a Difference(us) column
-    df_merged['Difference (us)'] = df_merged[f'{file2_name} Duration (us)'] - df_merged[f'{file1_name} Duration (us)']
-    
-    # Sort the DataFrame by Difference (us) in descending order
-    df_result = df_merged[['Phase', f'{file1_name} Duration (us)', f'{file2_name} Duration (us)', 'Difference (us)']]
-    df_result = df_result.sort_values(by='Difference (us)', ascending=False)
-    
-    # Determine the output file name if not provided
-    if output_file is None:
-        output_file = f'comparison_Major.md'
-    
-    # Output the result to a Markdown file
-    save_as_markdown(df_result, output_file)
-    print(f"Results have been saved to {output_file}")
-    
-    # Print the result to the console
-    print(df_result.to_markdown(index=False))
+def difference_column_name(section):
+    return 'Difference (us)' if section == 'Major' else 'Difference(us)'
 
-def compare_peims_files(file1, file2, output_file='comparison_PEIMs.md'):
-    # Read the two Markdown files and convert them to DataFrames
-    df1 = pd.read_csv(file1, delimiter='|', skipinitialspace=True, engine='python', header=0, skiprows=[1])
-    df2 = pd.read_csv(file2, delimiter='|', skipinitialspace=True, engine='python', header=0, skiprows=[1])
+def key_value_frame(table):
+    """Build a DataFrame holding only a SectionTable's key and compared time columns."""
+    import pandas as pd
 
-    # Remove extra columns that may have been misread
-    df1 = df1.loc[:, ~df1.columns.str.contains('^Unnamed')]
-    df2 = df2.loc[:, ~df2.columns.str.contains('^Unnamed')]
+    return pd.DataFrame({column: table.columns[column] for column in table.key_columns + [table.value_column]})
 
-    # Clean column names
-    df1 = clean_column_names(df1)
-    df2 = clean_column_names(df2)
+# Status of a key in a two-way comparison
+STATUS_COLUMN = 'Status'
+ADDED = 'added'
+REMOVED = 'removed'
+COMMON = 'common'
 
-    # Check if the required columns exist
-    required_columns = ['Instance GUID', 'Total Time(us)']
-    for col in required_columns:
-        if col not in df1.columns:
-            print(f"Column {col} is missing in file1")
-        if col not in df2.columns:
-            print(f"Column {col} is missing in file2")
-    
-    # Convert the Total Time(us) columns to integer type
-    df1['Total Time(us)'] = df1['Total Time(us)'].astype(int)
-    df2['Total Time(us)'] = df2['Total Time(us)'].astype(int)
-    
-    # Extract file names without extensions for clearer column names
-    file1_name = os.path.splitext(os.path.basename(file1))[0]
-    file2_name = os.path.splitext(os.path.basename(file2))[0]
-    
-    # Merge the two DataFrames on Instance GUID
-    df_merged = pd.merge(df1, df2, on='Instance GUID', suffixes=(f'_{file1_name}', f'_{file2_name}'))
-    
-    # Rename columns for clarity
-    df_merged.rename(columns={
-        f'Total Time(us)_{file1_name}': f'{file1_name} Total Time(us)',
-        f'Total Time(us)_{file2_name}': f'{file2_name} Total Time(us)'
-    }, inplace=True)
-    
-    # Calculate the difference and add a Difference(us) column
-    df_merged['Difference(us)'] = df_merged[f'{file2_name} Total Time(us)'] - df_merged[f'{file1_name} Total Time(us)']
-    
-    # Sort the DataFrame by Difference(us) in descending order
-    df_result = df_merged[['Instance GUID', f'{file1_name} Total Time(us)', f'{file2_name} Total Time(us)', 'Difference(us)']]
-    df_result = df_result.sort_values(by='Difference(us)', ascending=False)
-    
-    # Output the result to a Markdown file
-    save_as_markdown(df_result, output_file)
-    print(f"Results have been saved to {output_file}")
-    
-    # Print the result to the console
-    print(df_result.to_markdown(index=False))
+# Major rows that are not phase durations: the Total Duration row sums the phases, Reset End is a timestamp
+MAJOR_TOTAL_PHASE = 'Total Duration'
+MAJOR_SUMMARY_EXCLUDED = (MAJOR_TOTAL_PHASE, 'Reset End')
 
-def compare_drivers_files(file1, file2, output_file=None):
-    # Read the two Markdown files and convert them to DataFrames
-    df1 = pd.read_csv(file1, delimiter='|', skipinitialspace=True, engine='python', header=0, skiprows=[1])
-    df2 = pd.read_csv(file2, delimiter='|', skipinitialspace=True, engine='python', header=0, skiprows=[1])
+# Markdown cells of a missing time
+MISSING_CELLS = ('', 'None', 'nan', '<NA>')
 
-    # Remove extra columns that may have been misread
-    df1 = df1.loc[:, ~df1.columns.str.contains('^Unnamed')]
-    df2 = df2.loc[:, ~df2.columns.str.contains('^Unnamed')]
+# Rows of a Markdown table sorted in memory at once; longer tables are sorted in temporary files
+SORT_CHUNK_ROWS = 200000
+# Rows per pickled block of a temporary sorted run
+SPILL_BLOCK_ROWS = 4096
+# Rows of an in-memory table turned into (key, time) pairs at once
+ORDER_CHUNK_ROWS = 4096
+
+def to_time(value):
+    """A time cell as int, or None when it is missing (None, NaN, pandas.NA or an empty Markdown cell)."""
+    if value is None or type(value).__name__ == 'NAType' or value != value or value in MISSING_CELLS:
+        return None
+    return int(float(value))
+
+def key_order(key_columns):
+    """Positions of the rows ordered by key, as an array; equal keys keep their row order.
+
+    Each key column is coded by np.unique, whose codes follow the order of
+    the values, and the codes are sorted with one stable lexsort, so no key
+    tuples are built.
+    """
+    import numpy as np
+
+    codes = [np.unique(np.asarray(column, dtype=object), return_inverse=True)[1].ravel() for column in key_columns]
+    return np.lexsort(codes[::-1])
+
+def iter_ordered_rows(key_columns, values, order):
+    """Yield the (key, time) pairs of columnar rows in the given order, a chunk of rows at a time."""
+    for start in range(0, len(order), ORDER_CHUNK_ROWS):
+        positions = order[start:start + ORDER_CHUNK_ROWS].tolist()
+        keys = zip(*([column[position] for position in positions] for column in key_columns))
+        yield from zip(keys, (to_time(values[position]) for position in positions))
+
+def table_rows(table):
+    """Stream the (key, time) pairs of a SectionTable in key order."""
+    key_columns = [table.columns[column] for column in table.key_columns]
+    return iter_ordered_rows(key_columns, table.values(), key_order(key_columns))
+
+def frame_rows(section, df):
+    """Stream the (key, time) pairs of a DataFrame holding the section's key and time columns, in key order."""
+    key_columns = [df[column].to_numpy(dtype=object) for column in SECTION_KEYS[section]]
+    return iter_ordered_rows(key_columns, df[SECTION_VALUES[section]].to_numpy(dtype=object), key_order(key_columns))
+
+def iter_md_rows(section, file):
+    """Stream the (key, time) pairs of a Markdown table written by ProcessData, one line at a time."""
+    key_columns = SECTION_KEYS[section]
+    value_column = SECTION_VALUES[section]
+    with open(file, 'r') as f:
+        header = [cell.strip() for cell in next(f).strip().strip('|').split('|')]
+        for column in key_columns + [value_column]:
+            if column not in header:
+                raise KeyError(f"Column {column} is missing in {file}")
+        key_indexes = [header.index(column) for column in key_columns]
+        value_index = header.index(value_column)
+        next(f, None)  # separator row
+        for line in f:
+            cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+            if len(cells) == len(header):
+                yield tuple(cells[index] for index in key_indexes), to_time(cells[value_index])
+
+def iter_spilled_rows(run):
+    """Read back the blocks of rows that external_sort spilled to run."""
+    while True:
+        try:
+            block = pickle.load(run)
+        except EOFError:
+            return
+        yield from block
+
+def external_sort(rows, chunk_rows=None):
+    """Stream (key, time) pairs sorted by key, holding at most chunk_rows of them in memory.
+
+    Input beyond one chunk is sorted a chunk at a time into temporary files
+    and the sorted runs are merged back with heapq.merge. Both sorts are
+    stable, so repeated keys keep their input order.
+    """
+    chunk_rows = chunk_rows or SORT_CHUNK_ROWS
+    rows = iter(rows)
+    with contextlib.ExitStack() as stack:
+        runs = []
+        while True:
+            chunk = sorted(islice(rows, chunk_rows), key=itemgetter(0))
+            if not runs and len(chunk) < chunk_rows:
+                # The whole input fits in one chunk
+                yield from chunk
+                return
+            if not chunk:
+                break
+            run = stack.enter_context(tempfile.TemporaryFile())
+            for start in range(0, len(chunk), SPILL_BLOCK_ROWS):
+                pickle.dump(chunk[start:start + SPILL_BLOCK_ROWS], run, pickle.HIGHEST_PROTOCOL)
+            run.seek(0)
+            runs.append(iter_spilled_rows(run))
+            del chunk
+        yield from heapq.merge(*runs, key=itemgetter(0))
 
-    # Clean column names
-    df1 = clean_column_names(df1)
-    df2 = clean_column_names(df2)
+def md_rows(section, file, chunk_rows=None):
+    """Stream the (key, time) pairs of a Markdown table written by ProcessData in key order (see external_sort)."""
+    return external_sort(iter_md_rows(section, file), chunk_rows)
 
-    # Check if the required columns exist
-    required_columns = ['Driver Name', 'Description', 'Total Time(us)']
+def merge_sorted(rows1, rows2):
+    """Full outer merge join of two (key, time) streams sorted by key.
+
+    Yields (key, time1, time2, status) with None for the side missing the key,
+    reading each stream one row at a time. Repeated keys pair up in order;
+    the surplus of either side is reported as removed or added.
+    """
+    rows1 = iter(rows1)
+    rows2 = iter(rows2)
+    row1 = next(rows1, None)
+    row2 = next(rows2, None)
+    while row1 is not None and row2 is not None:
+        if row1[0] == row2[0]:
+            yield row1[0], row1[1], row2[1], COMMON
+            row1 = next(rows1, None)
+            row2 = next(rows2, None)
+        elif row1[0] < row2[0]:
+            yield row1[0], row1[1], None, REMOVED
+            row1 = next(rows1, None)
+        else:
+            yield row2[0], None, row2[1], ADDED
+            row2 = next(rows2, None)
+    while row1 is not None:
+        yield row1[0], row1[1], None, REMOVED
+        row1 = next(rows1, None)
+    while row2 is not None:
+        yield row2[0], None, row2[1], ADDED
+        row2 = next(rows2, None)
+
+def diff_rows(rows1, rows2):
+    """Yield (key, time1, time2, difference, status) of a full outer merge join.
+
+    An added key costs its whole time and a removed key saves its whole time,
+    so the differences of all rows sum to the change of the section total.
+    """
+    for key, time1, time2, status in merge_sorted(rows1, rows2):
+        if status == ADDED:
+            difference = time2
+        elif status == REMOVED:
+            difference = None if time1 is None else -time1
+        else:
+            difference = None if time1 is None or time2 is None else time2 - time1
+        yield key, time1, time2, difference, status
+
+def compare_sorted(section, rows1, rows2, file1_name, file2_name):
+    """Compare two key-sorted (key, time) streams of one section into a DataFrame sorted by difference.
+
+    Only the comparison result is materialized; see diff_rows for how added
+    and removed keys are costed.
+    """
+    import pandas as pd
+
+    key_columns = SECTION_KEYS[section]
+    value_column = SECTION_VALUES[section]
+    difference_column = difference_column_name(section)
+    column1 = f'{file1_name} {value_column}'
+    column2 = f'{file2_name} {value_column}'
+
+    keys, times1, times2, differences, statuses = [], [], [], [], []
+    for key, time1, time2, difference, status in diff_rows(rows1, rows2):
+        keys.append(key)
+        times1.append(time1)
+        times2.append(time2)
+        differences.append(difference)
+        statuses.append(status)
+
+    columns = {column: [key[index] for key in keys] for index, column in enumerate(key_columns)}
+    columns[column1] = pd.array(times1, dtype='Int64')
+    columns[column2] = pd.array(times2, dtype='Int64')
+    columns[difference_column] = pd.array(differences, dtype='Int64')
+    columns[STATUS_COLUMN] = statuses
+    df_result = pd.DataFrame(columns)
+
+    # Sort by difference in descending order, rows without a difference last
+    return df_result.sort_values(by=difference_column, ascending=False, na_position='last', kind='stable').reset_index(drop=True)
+
+def compare_dataframes(section, df1, df2, file1_name, file2_name):
+    """Compare two DataFrames of one section and return the result sorted by difference.
+
+    Keys present in only one of them are kept as added or removed rows.
+    """
+    required_columns = SECTION_KEYS[section] + [SECTION_VALUES[section]]
     for col in required_columns:
         if col not in df1.columns:
             print(f"Column {col} is missing in file1")
         if col not in df2.columns:
             print(f"Column {col} is missing in file2")
-    
-    # Convert the Total Time(us) columns to integer type
-    df1['Total Time(us)'] = df1['Total Time(us)'].astype(int)
-    df2['Total Time(us)'] = df2['Total Time(us)'].astype(int)
-    
-    # Extract file names without extensions for clearer column names
-    file1_name = os.path.splitext(os.path.basename(file1))[0]
-    file2_name = os.path.splitext(os.path.basename(file2))[0]
-    
-    # Merge the two DataFrames on Driver Name and Description
-    df_merged = pd.merge(df1, df2, on=['Driver Name', 'Description'], suffixes=(f'_{file1_name}', f'_{file2_name}'))
-    
-    # Rename columns for clarity
-    df_merged.rename(columns={
-        f'Total Time(us)_{file1_name}': f'{file1_name} Total Time(us)',
-        f'Total Time(us)_{file2_name}': f'{file2_name} Total Time(us)'
-    }, inplace=True)
-    
-    # Calculate the difference and add a Difference(us) column
-    df_merged['Difference(us)'] = df_merged[f'{file2_name} Total Time(us)'] - df_merged[f'{file1_name} Total Time(us)']
-    
-    # Sort the DataFrame by Difference (us) in descending order
-    df_result = df_merged[['Driver Name', 'Description', f'{file1_name} Total Time(us)', f'{file2_name} Total Time(us)', 'Difference(us)']]
-    df_result = df_result.sort_values(by='Difference(us)', ascending=False)
-    
+
+    return compare_sorted(section, frame_rows(section, df1), frame_rows(section, df2), file1_name, file2_name)
+
+def compare_tables(table1, table2, file1_name, file2_name):
+    """Compare two in-memory SectionTables of the same section, keeping added and removed keys."""
+    return compare_sorted(table1.section, table_rows(table1), table_rows(table2), file1_name, file2_name)
+
+def diff_summary(section, df_result):
+    """Count and total difference of the common, added and removed rows of a two-way comparison.
+
+    Major rows are phase durations plus Reset End (a timestamp) and Total
+    Duration (their sum); only the phases are summed, and the total delta
+    is the Total Duration row's own difference when both logs have it.
+    """
+    difference_column = difference_column_name(section)
+    rows = df_result
+    total = None
+    if section == 'Major':
+        phases = SECTION_KEYS[section][0]
+        total_rows = rows[rows[phases] == MAJOR_TOTAL_PHASE][difference_column].dropna()
+        if len(total_rows):
+            total = int(total_rows.iloc[0])
+        rows = rows[~rows[phases].isin(MAJOR_SUMMARY_EXCLUDED)]
+
+    summary = {}
+    for status in (COMMON, ADDED, REMOVED):
+        status_rows = rows[rows[STATUS_COLUMN] == status]
+        summary[status] = (len(status_rows), int(status_rows[difference_column].sum()))
+    if total is None:
+        total = sum(difference for _, difference in summary.values())
+    summary['total'] = (len(rows), total)
+    return summary
+
+def print_diff_summary(section, df_result):
+    summary = diff_summary(section, df_result)
+    print(f"{section} total delta: {summary['total'][1]:+d} us "
+          f"(common {summary[COMMON][1]:+d} us over {summary[COMMON][0]} keys, "
+          f"added {summary[ADDED][1]:+d} us over {summary[ADDED][0]} keys, "
+          f"removed {summary[REMOVED][1]:+d} us over {summary[REMOVED][0]} keys)")
+
+def align_runs(section, frames):
+    """Outer-join the time column of every run on the section key; one Int64 column per run."""
+    import pandas as pd
+
+    key_columns = SECTION_KEYS[section]
+    value_column = SECTION_VALUES[section]
+    return pd.concat(
+        [df.set_index(key_columns)[value_column].astype('Int64').rename(name) for name, df in frames.items()],
+        axis=1, join='outer'
+    )
+
+def compare_matrix(section, frames, baseline=None):
+    """Compare any number of runs of one section against a baseline run.
+
+    frames maps run name -> DataFrame (in build order); baseline defaults to
+    the first run. All runs are aligned on the section key in a single outer
+    join, giving one time column per run plus one difference column per
+    non-baseline run. Keys missing from a run are left empty.
+    """
+    import numpy as np
+    import pandas as pd
+
+    value_column = SECTION_VALUES[section]
+    names = list(frames)
+    baseline = names[0] if baseline is None else baseline
+    if baseline not in frames:
+        raise KeyError(f"Baseline {baseline} is not one of the compared runs")
+
+    # Align every run on the section key at once
+    aligned = align_runs(section, frames)
+    aligned.columns = [f'{name} {value_column}' for name in names]
+
+    # Differences of every run against the baseline in one vectorized subtraction
+    values = aligned.to_numpy(dtype='float64', na_value=float('nan'))
+    base_index = names.index(baseline)
+    differences = values - values[:, [base_index]]
+    difference_column = difference_column_name(section)
+    difference_columns = []
+    for index, name in enumerate(names):
+        if name != baseline:
+            column = f'{name} {difference_column}'
+            aligned[column] = pd.array(differences[:, index]).astype('Int64')
+            difference_columns.append(column)
+
+    # Sort by the largest regression in any build, keys without a difference last
+    if difference_columns:
+        largest = aligned[difference_columns].max(axis=1).to_numpy(dtype='float64', na_value=-np.inf)
+        aligned = aligned.iloc[np.argsort(-largest, kind='stable')]
+    return aligned.reset_index()
+
+def compare_matrix_tables(tables, baseline=None):
+    """Compare {run name: SectionTable} of one section against a baseline run."""
+    section = next(iter(tables.values())).section
+    return compare_matrix(section, {name: key_value_frame(table) for name, table in tables.items()}, baseline)
+
+def compare_matrix_files(section, files, output_file=None):
+    """Compare any number of Markdown files of one section; the first file is the baseline."""
+    # Read every Markdown file once
+    frames = {os.path.splitext(os.path.basename(file))[0]: read_md_table(file) for file in files}
+    df_result = compare_matrix(section, frames)
+
     # Determine the output file name if not provided
     if output_file is None:
-        output_file = f'comparison_Drivers.md'
-    
-    # Output the result to a Markdown file
+        output_file = f'comparison_matrix_{section}.md'
+
     save_as_markdown(df_result, output_file)
     print(f"Results have been saved to {output_file}")
-    
-    # Print the result to the console
-    print(df_result.to_markdown(index=False))
 
+def compare_files(section, file1, file2, output_file):
+    # Stream the key and time columns of the two Markdown files in key order, without building DataFrames
+    rows1 = md_rows(section, file1)
+    rows2 = md_rows(section, file2)
 
-def compare_general_files(file1, file2, output_file=None):
-    # Read the two Markdown files and convert them to DataFrames
-    df1 = pd.read_csv(file1, delimiter='|', skipinitialspace=True, engine='python', header=0, skiprows=[1])
-    df2 = pd.read_csv(file2, delimiter='|', skipinitialspace=True, engine='python', header=0, skiprows=[1])
-
-    # Remove extra columns that may have been misread
-    df1 = df1.loc[:, ~df1.columns.str.contains('^Unnamed')]
-    df2 = df2.loc[:, ~df2.columns.str.contains('^Unnamed')]
-
-    # Clean column names
-    df1 = clean_column_names(df1)
-    df2 = clean_column_names(df2)
-
-    # Check if the required columns exist
-    required_columns = ['Name', 'Description', 'Total Time(us)']
-    for col in required_columns:
-        if col not in df1.columns:
-            print(f"Column {col} is missing in file1")
-        if col not in df2.columns:
-            print(f"Column {col} is missing in file2")
-    
-    # Convert the Total Time(us) columns to integer type
-    df1['Total Time(us)'] = df1['Total Time(us)'].astype(int)
-    df2['Total Time(us)'] = df2['Total Time(us)'].astype(int)
-    
     # Extract file names without extensions for clearer column names
     file1_name = os.path.splitext(os.path.basename(file1))[0]
     file2_name = os.path.splitext(os.path.basename(file2))[0]
-    
-    # Merge the two DataFrames on Name and Description
-    df_merged = pd.merge(df1, df2, on=['Name', 'Description'], suffixes=(f'_{file1_name}', f'_{file2_name}'))
-    
-    # Rename columns for clarity
-    df_merged.rename(columns={
-        f'Total Time(us)_{file1_name}': f'{file1_name} Total Time(us)',
-        f'Total Time(us)_{file2_name}': f'{file2_name} Total Time(us)'
-    }, inplace=True)
-    
-    # Calculate the difference and add a Difference(us) column
-    df_merged['Difference(us)'] = df_merged[f'{file2_name} Total Time(us)'] - df_merged[f'{file1_name} Total Time(us)']
-    
-    # Sort the DataFrame by Difference(us) in descending order
-    df_result = df_merged[['Name', 'Description', f'{file1_name} Total Time(us)', f'{file2_name} Total Time(us)', 'Difference(us)']]
-    df_result = df_result.sort_values(by='Difference(us)', ascending=False)
-    
+
+    df_result = compare_sorted(section, rows1, rows2, file1_name, file2_name)
+
     # Determine the output file name if not provided
     if output_file is None:
-        output_file = f'comparison_General.md'
-    
+        output_file = f'comparison_{section}.md'
+
     # Output the result to a Markdown file
     save_as_markdown(df_result, output_file)
     print(f"Results have been saved to {output_file}")
-    
+
     # Print the result to the console
     print(df_result.to_markdown(index=False))
+    print_diff_summary(section, df_result)
+
+def compare_major_files(file1, file2, output_file=None):
+    compare_files('Major', file1, file2, output_file)
+
+def compare_peims_files(file1, file2, output_file='comparison_PEIMs.md'):
+    compare_files('PEIMs', file1, file2, output_file)
+
+def compare_drivers_files(file1, file2, output_file=None):
+    compare_files('Drivers', file1, file2, output_file)
+
+def compare_general_files(file1, file2, output_file=None):
+    compare_files('General', file1, file2, output_file)
+
+def mann_whitney(baseline, candidate):
+    """Two-sided Mann-Whitney U test of every row of two 2-D arrays at once.
+
+    baseline is keys x K1 and candidate is keys x K2. Uses the normal
+    approximation with tie and continuity correction. Returns (U, p) where
+    U counts how often a candidate sample beats a baseline sample.
+    """
+    import numpy as np
+
+    n1 = baseline.shape[1]
+    n2 = candidate.shape[1]
+    n = n1 + n2
+
+    # U from all pairwise comparisons (keys x K2 x K1)
+    greater = (candidate[:, :, None] > baseline[:, None, :]).sum(axis=(1, 2))
+    equal = (candidate[:, :, None] == baseline[:, None, :]).sum(axis=(1, 2))
+    u = greater + 0.5 * equal
+
+    # Tie correction: sizes of runs of equal values in each sorted row
+    combined = np.sort(np.concatenate([baseline, candidate], axis=1), axis=1)
+    new_group = np.ones(combined.shape, dtype=bool)
+    new_group[:, 1:] = combined[:, 1:] != combined[:, :-1]
+    group_ids = np.cumsum(new_group, axis=1) - 1 + np.arange(combined.shape[0])[:, None] * n
+    tie_sizes = np.bincount(group_ids.ravel(), minlength=combined.shape[0] * n).reshape(combined.shape[0], n)
+    tie_term = (tie_sizes ** 3 - tie_sizes).sum(axis=1)
+
+    mean = n1 * n2 / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    deviation = np.abs(u - mean) - 0.5
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(variance > 0, np.maximum(deviation, 0) / np.sqrt(variance), 0.0)
+    p = np.array([math.erfc(value / math.sqrt(2)) for value in z]) if len(z) else np.empty(0)
+    return u, p
+
+def benjamini_hochberg(p):
+    """False discovery rate adjusted q-values for an array of p-values."""
+    import numpy as np
+
+    count = len(p)
+    if count == 0:
+        return p
+    order = np.argsort(p)
+    ranked = p[order] * count / np.arange(1, count + 1)
+    q = np.empty(count)
+    q[order] = np.minimum.accumulate(ranked[::-1])[::-1].clip(max=1.0)
+    return q
+
+def detect_regressions(section, baseline_frames, candidate_frames, alpha=0.05, min_difference=0):
+    """Test every key of a section for a regression between two sets of boots.
+
+    baseline_frames and candidate_frames map boot name -> DataFrame (K boots
+    per build). A key missing from a boot counts as 0 us in that boot. Keys
+    are reported when the candidate median is higher by more than
+    min_difference us and the Mann-Whitney test stays significant at alpha
+    after Benjamini-Hochberg correction across all keys of the section.
+    Difference(%) is inf for a key growing from a 0 us baseline median and
+    empty when both medians are 0.
+    """
+    import numpy as np
+    import pandas as pd
+
+    key_columns = SECTION_KEYS[section]
+    aligned = align_runs(section, {**{('baseline', name): df for name, df in baseline_frames.items()},
+                                   **{('candidate', name): df for name, df in candidate_frames.items()}})
+    values = aligned.to_numpy(dtype='float64', na_value=0.0)
+    baseline = values[:, :len(baseline_frames)]
+    candidate = values[:, len(baseline_frames):]
+
+    u, p = mann_whitney(baseline, candidate)
+    q = benjamini_hochberg(p)
+    baseline_median = np.median(baseline, axis=1)
+    candidate_median = np.median(candidate, axis=1)
+    difference = candidate_median - baseline_median
+
+    # Against a 0 us baseline only a growth is infinite; no change has no percentage
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent = np.where(baseline_median > 0, difference / baseline_median * 100,
+                           np.where(difference > 0, np.inf, np.nan))
+    result = pd.DataFrame({
+        'Baseline Median(us)': baseline_median,
+        'Candidate Median(us)': candidate_median,
+        'Median Difference(us)': difference,
+        'Difference(%)': np.round(percent, 1),
+        'U': u,
+        'p-value': p,
+        'q-value': q
+    }, index=aligned.index).reset_index()
+    result.columns = key_columns + list(result.columns[len(key_columns):])
+
+    significant = (q < alpha) & (difference > min_difference)
+    return result[significant].sort_values(by='Median Difference(us)', ascending=False)
+
+# Command-line mode and the section it compares
+MODE_SECTIONS = {'major': 'Major', 'drivers': 'Drivers', 'peims': 'PEIMs', 'general': 'General'}
 
 if __name__ == "__main__":
     check_python_version()
 
+    # N-way mode: python CompareTime.py matrix <section mode> <output_file.md> <baseline.md> <file2.md> [...]
+    if len(sys.argv) > 1 and sys.argv[1] == "matrix":
+        if len(sys.argv) < 6 or sys.argv[2] not in MODE_SECTIONS:
+            print("Usage: python script.py matrix <peims|drivers|general|major> <output_file.md> <baseline.md> <file2.md> [<file3.md> ...]")
+            sys.exit(1)
+        compare_matrix_files(MODE_SECTIONS[sys.argv[2]], sys.argv[4:], sys.argv[3])
+        sys.exit(0)
+
     if len(sys.argv) < 4 or len(sys.argv) > 5:
         print("Usage: python script.py <mode> <file1.md> <file2.md> [output_file.md]")
         sys.exit(1)
@@ -0,0 +1,166 @@
+import sys
+import os
+import glob
+import time
+import argparse
+import contextlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import DpLogPipeline
+import DpLogCache
+import DpLogProfile
+import DpLogFpdt
+import LogCapture
+
+def expand_archive(path):
+    # A zip or tar bundle stands for the logs it holds
+    return LogCapture.archive_members(path) if LogCapture.is_archive(path) else [path]
+
+def collect_logs(inputs, recursive=False):
+    """Expand files, directories and glob patterns into a list of unique .log files.
+
+    Compressed logs (.log.gz, .log.xz, .log.bz2) are taken as they are; zip and
+    tar archives expand into their log members, addressed as <archive>/<member>.
+    Dumped FPDT tables (.fbpt, .fpdt, or .bin starting with FBPT) are taken as they are too.
+    Inputs keep their command-line order; each directory or pattern expands in sorted order.
+    """
+    logs = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            pattern = '**/*' if recursive else '*'
+            logs.extend(sorted(p for p in path.glob(pattern) if p.is_file() and (LogCapture.is_log_name(p) or LogCapture.is_archive(p) or DpLogFpdt.is_fpdt(p))))
+        elif path.is_file():
+            logs.append(path)
+        elif LogCapture.split_archive_path(path)[1] is not None:
+            logs.append(path)
+        else:
+            matches = glob.glob(item, recursive=recursive)
+            if not matches:
+                print(f"Warning: {item} matched no log files, skipping.")
+            logs.extend(sorted(Path(match) for match in matches if Path(match).is_file()))
+    logs = [log for path in logs for log in expand_archive(path)]
+
+    # De-duplicate (the same file may match several inputs), keeping the first occurrence
+    unique = {}
+    for log in logs:
+        unique.setdefault(log.resolve(), log)
+    return list(unique.values())
+
+def assign_output_folders(logs, output_folder, used=None):
+    """Give each log its own Output/<basename> folder, suffixing duplicate basenames.
+
+    used holds folder names already taken; it is updated in place when given.
+    """
+    folders = {}
+    used = set() if used is None else used
+    for log in logs:
+        name = LogCapture.log_stem(log)
+        index = 2
+        while name in used:
+            name = f"{LogCapture.log_stem(log)}_{index}"
+            index += 1
+        used.add(name)
+        folders[log] = Path(output_folder) / name
+    return folders
+
+def process_one(log_file, output_folder, cache=None, outputs=True, quiet=True, profile=False, log_hash=None, keep_tables=False):
+    """Worker entry point: process one log and return a summary dict (never raises).
+
+    The section tables are only sent back with keep_tables=True, sparing the
+    pickling when the caller just needs the summary. With profile=True the
+    summary also carries the worker's stage profile (see DpLogProfile).
+    log_hash, the DpLogCache.content_hash of the log, saves hashing it again for the cache.
+    """
+    start = time.perf_counter()
+    profiler = DpLogProfile.Profiler() if profile else DpLogProfile.NULL_PROFILER
+    summary = {
+        'log': str(log_file),
+        'output': str(output_folder),
+        'bytes': 0,
+        'status': 'OK',
+        'sections': '',
+        'total_us': '',
+        'tables': None
+    }
+    try:
+        summary['bytes'] = LogCapture.input_size(log_file)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+            tables = DpLogPipeline.process_log(log_file, output_folder, markdown=outputs, excel=outputs,
+                                               profiler=profiler, log_hash=log_hash, **(cache or {}))
+        if keep_tables:
+            summary['tables'] = tables
+        summary['sections'] = ', '.join(f"{section}:{len(table)}" for section, table in tables.items())
+        if 'Major' in tables:
+            phases = dict(zip(tables['Major'].columns['Phase'], tables['Major'].columns['Duration (us)']))
+            summary['total_us'] = phases.get('Total Duration', '')
+    except SystemExit as e:
+        # LogCapture reports unreadable logs by exiting; keep the rest of the batch going
+        summary['status'] = f"FAILED (exit {e.code})"
+    except Exception as e:
+        summary['status'] = f"FAILED ({e})"
+    summary['seconds'] = time.perf_counter() - start
+    if profile:
+        summary['profile'] = profiler.report(log=summary['log'], log_bytes=summary['bytes'], pid=os.getpid())
+    return summary
+
+def run_batch(logs, output_folder='Output', workers=None, keep_tables=False, cache=None, outputs=True, profile=False):
+    """Process logs on a process pool and return their summaries in input order.
+
+    cache holds the process_log cache keyword arguments (see DpLogCache.cache_options);
+    outputs=False skips the per-log Markdown and Excel files; profile=True adds
+    each worker's stage profile to its summary.
+    """
+    folders = assign_output_folders(logs, output_folder)
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_one, log, folders[log], cache, outputs, True, profile, keep_tables=keep_tables): log
+                   for log in logs}
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries[futures[future]] = summary
+            print(f"[{len(summaries)}/{len(logs)}] {summary['status']:<6} {summary['log']} ({summary['seconds']:.2f} s)")
+    return [summaries[log] for log in logs]
+
+def write_index(summaries, index_file):
+    """Write a consolidated Markdown index of every processed log."""
+    with open(index_file, 'w') as file:
+        file.write('| Log | Size (bytes) | Status | Sections | Total Duration (us) | Seconds | Output |\n')
+        file.write('|-----|--------------|--------|----------|---------------------|---------|--------|\n')
+        for s in summaries:
+            file.write(f"| {s['log']} | {s['bytes']} | {s['status']} | {s['sections']} | {s['total_us']} | {s['seconds']:.3f} | {s['output']} |\n")
+    print(f'Index saved to: {index_file}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Process many EDKII Dp.efi log files in parallel.')
+    parser.add_argument('inputs', nargs='+', help='Log files, directories or glob patterns (e.g. "Log/**/*.log")')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--output_folder', type=str, default='Output', help='Root folder for per-log outputs (default: Output)')
+    parser.add_argument('--recursive', action='store_true', help='Search directories and ** patterns recursively')
+    DpLogCache.add_cache_arguments(parser)
+    args = parser.parse_args()
+
+    logs = collect_logs(args.inputs, args.recursive)
+    if not logs:
+        print("Error: No .log files found.")
+        sys.exit(1)
+
+    Path(args.output_folder).mkdir(parents=True, exist_ok=True)
+    print(f"Processing {len(logs)} log files...")
+    start = time.perf_counter()
+    summaries = run_batch(logs, args.output_folder, args.workers, cache=DpLogCache.cache_options(args))
+    elapsed = time.perf_counter() - start
+
+    write_index(summaries, Path(args.output_folder) / 'index.md')
+
+    # Report aggregate throughput
+    total_mb = sum(s['bytes'] for s in summaries) / (1024 * 1024)
+    failed = sum(1 for s in summaries if s['status'] != 'OK')
+    print(f"Processed {len(summaries)} logs ({total_mb:.2f} MB) in {elapsed:.2f} s: "
+          f"{len(summaries) / elapsed:.2f} logs/s, {total_mb / elapsed:.2f} MB/s, {failed} failed.")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
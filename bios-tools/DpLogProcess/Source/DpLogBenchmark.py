@@ -0,0 +1,118 @@
+import json
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import DpLogGenerate
+import DpLogPipeline
+import DpLogProfile
+
+# Stages measured for every log size, each in a fresh process so peak RSS belongs to that stage alone
+STAGES = ['capture', 'aggregate', 'cache_store', 'cache_load', 'export_markdown', 'export_excel', 'export_html', 'compare']
+
+def drain(sections):
+    """Read every captured line without parsing it; returns (lines, characters)."""
+    lines = 0
+    characters = 0
+    for _, section_lines in sections:
+        for line in section_lines:
+            lines += 1
+            characters += len(line) + 1
+    return lines, characters
+
+def run_stage(stage, log_file, work_dir, cache_dir):
+    """Run one stage on log_file in this (fresh) process and return its measurements."""
+    import DpLogCache
+
+    # Stages after aggregate need the tables; they come from the parse cache and are not measured
+    tables = None if stage in ('capture', 'aggregate') else DpLogPipeline.load_or_aggregate(log_file, cache_dir)
+    work_dir = Path(work_dir)
+    if stage == 'cache_load':
+        DpLogCache.store(work_dir / 'cache', 'benchmark', tables)
+    profiler = DpLogProfile.Profiler()
+    start_rss_kb = DpLogProfile.peak_rss_kb()
+    with profiler.stage(stage, start_rss_kb=start_rss_kb) as record:
+        if stage == 'capture':
+            record['lines'], record['characters'] = drain(DpLogPipeline.capture(log_file))
+        elif stage == 'aggregate':
+            tables = DpLogPipeline.aggregate(DpLogPipeline.capture(log_file))
+        elif stage == 'cache_store':
+            DpLogCache.store(work_dir / 'cache', 'benchmark', tables)
+        elif stage == 'cache_load':
+            tables = DpLogCache.load(work_dir / 'cache', 'benchmark')
+        elif stage == 'export_markdown':
+            DpLogPipeline.export_markdown(tables, work_dir, 'benchmark')
+        elif stage == 'export_excel':
+            DpLogPipeline.export_excel(tables, work_dir / 'benchmark.xlsx')
+        elif stage == 'export_html':
+            DpLogPipeline.export_html(tables, work_dir / 'benchmark.html', 'benchmark')
+        elif stage == 'compare':
+            DpLogPipeline.compare(tables, tables, 'run1', 'run2')
+    if stage == 'aggregate':
+        # Leave the tables in the parse cache for the following stages
+        DpLogCache.store(cache_dir, DpLogCache.cache_key(log_file), tables)
+    record['rows'] = record['lines'] if stage == 'capture' else sum(len(table) for table in tables.values())
+    return record
+
+def measure(stage, log_file, work_dir, cache_dir):
+    # A new single-worker pool per stage gives every measurement a clean address space
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_stage, stage, str(log_file), str(work_dir), str(cache_dir)).result()
+
+def rss_mb(rss_kb):
+    return f"{rss_kb / 1024:.1f}" if rss_kb is not None else '-'
+
+def print_results(results):
+    # Stage RSS is how far the stage pushed the peak above what the process held when it started
+    print('| Size (MB) | Stage | Rows | Wall (s) | CPU (s) | MB/s | Peak RSS (MB) | Stage RSS (MB) |')
+    print('|-----------|-------|------|----------|---------|------|---------------|----------------|')
+    for result in results:
+        stage_rss_kb = None if result['peak_rss_kb'] is None else result['peak_rss_kb'] - result['start_rss_kb']
+        print(f"| {result['size_mb']:g} | {result['stage']} | {result['rows']} | {result['wall_seconds']:.3f} | "
+              f"{result['cpu_seconds']:.3f} | {result['mb_per_second']:.1f} | {rss_mb(result['peak_rss_kb'])} | {rss_mb(stage_rss_kb)} |")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Dp.efi log pipeline stages on synthetic logs of growing size.')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 10, 100, 1000], help='Log sizes in MB (default: 1 10 100 1000)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help='Stages to measure (default: all)')
+    parser.add_argument('--entries', type=int, default=1000, help='Distinct entries per section (default: 1000)')
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of the call repetition (default: 1.0)')
+    parser.add_argument('--encoding', choices=list(DpLogGenerate.ENCODING_WIDTH), default='utf-8', help='Log encoding (default: utf-8)')
+    parser.add_argument('--log_folder', type=str, default=str(Path("Output") / "benchmark"), help='Where generated logs are kept and reused (default: Output/benchmark)')
+    parser.add_argument('--output', type=str, default=None, help='JSON results file, for tracking runs over time (default: <log_folder>/benchmark.json)')
+    args = parser.parse_args()
+
+    log_folder = Path(args.log_folder)
+    log_folder.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    for size_mb in args.sizes:
+        # Logs are named after their parameters, so later runs reuse them
+        log_file = log_folder / f"synthetic_{size_mb:g}MB_{args.entries}_{args.skew:g}_{args.encoding}.log"
+        if not log_file.exists():
+            print(f"Generating {log_file}...")
+            DpLogGenerate.generate_log(log_file, size_mb, args.entries, args.skew, args.encoding)
+        log_bytes = log_file.stat().st_size
+
+        for stage in args.stages:
+            with tempfile.TemporaryDirectory(dir=log_folder) as work_dir:
+                record = measure(stage, log_file, work_dir, log_folder / ".cache")
+            record.update({
+                'size_mb': size_mb,
+                'log_bytes': log_bytes,
+                'mb_per_second': log_bytes / (1024 * 1024) / max(record['wall_seconds'], 1e-9)
+            })
+            results.append(record)
+            print(f"{size_mb:g} MB {stage}: {record['wall_seconds']:.3f} s")
+
+    print_results(results)
+
+    output = Path(args.output) if args.output else log_folder / "benchmark.json"
+    with open(output, 'w') as file:
+        json.dump({'entries': args.entries, 'skew': args.skew, 'encoding': args.encoding, 'results': results}, file, indent=2)
+    print(f"Results saved to: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+
+import ProcessData
+import LogCapture
+from DpRecords import SectionTable
+
+# Default cache location and size bound
+DEFAULT_CACHE_DIR = Path("Output") / ".cache"
+DEFAULT_CACHE_SIZE_MB = 512
+
+# Major durations may be missing (None); stored as this sentinel since real durations are never negative
+MISSING_VALUE = -1
+
+def content_hash(log_file):
+    """Hash the (decompressed) log content alone, independent of the parser version."""
+    digest = hashlib.blake2b(digest_size=20)
+    with LogCapture.open_binary(log_file) as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(log_file, variant=None, log_hash=None):
+    """Hash the log content hash together with the parser version and any output variant.
+
+    log_hash is the content_hash of log_file when the caller already has it.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"parser-{ProcessData.PARSER_VERSION}\0".encode())
+    if variant:
+        digest.update(f"{variant}\0".encode())
+    digest.update((log_hash or content_hash(log_file)).encode())
+    return digest.hexdigest()
+
+def cache_path(cache_dir, key):
+    return Path(cache_dir) / f"{key}.npz"
+
+def load(cache_dir, key):
+    """Return the cached {section: SectionTable} for key, or None on a miss."""
+    import numpy as np
+
+    path = cache_path(cache_dir, key)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            tables = {}
+            for name in data.files:
+                section, column = name.split('|', 1)
+                values = data[name]
+                if values.dtype.kind == 'U':
+                    values = values.tolist()
+                elif section == 'Major':
+                    values = [None if value == MISSING_VALUE else value for value in values.tolist()]
+                tables.setdefault(section, {})[column] = values
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+
+    # Touch the entry so eviction treats it as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return {section: SectionTable(section, columns) for section, columns in tables.items()}
+
+def store(cache_dir, key, tables, max_size_mb=DEFAULT_CACHE_SIZE_MB):
+    """Store tables under key as an uncompressed columnar .npz, then enforce the size bound."""
+    import numpy as np
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    arrays = {}
+    for section, table in tables.items():
+        for column, values in table.columns.items():
+            if isinstance(values, np.ndarray):
+                arrays[f"{section}|{column}"] = values
+            elif section == 'Major' and column == 'Duration (us)':
+                arrays[f"{section}|{column}"] = np.array([MISSING_VALUE if value is None else value for value in values], dtype=np.int64)
+            else:
+                arrays[f"{section}|{column}"] = np.array(values, dtype=str)
+
+    # Write to a temporary file and rename, so concurrent batch workers never see a partial entry
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, cache_path(cache_dir, key))
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    evict(cache_dir, max_size_mb)
+
+def evict(cache_dir, max_size_mb=DEFAULT_CACHE_SIZE_MB):
+    """Delete least recently used entries until the cache fits in max_size_mb."""
+    entries = []
+    for path in Path(cache_dir).glob('*.npz'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total_size = sum(size for _, size, _ in entries)
+    max_size = max_size_mb * 1024 * 1024
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total_size <= max_size:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total_size -= size
+
+def add_cache_arguments(parser):
+    """Add the parse cache options shared by the command-line scripts."""
+    parser.add_argument('--cache_dir', type=str, default=str(DEFAULT_CACHE_DIR), help=f'Parse cache folder (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache_size_mb', type=int, default=DEFAULT_CACHE_SIZE_MB, help=f'Parse cache size limit in MB, least recently used entries are evicted (default: {DEFAULT_CACHE_SIZE_MB})')
+    parser.add_argument('--no_cache', action='store_true', help='Always re-parse logs instead of using the parse cache')
+
+def cache_options(args):
+    """Return the process_log cache keyword arguments selected on the command line."""
+    if args.no_cache:
+        return {'cache_dir': None}
+    return {'cache_dir': args.cache_dir, 'cache_size_mb': args.cache_size_mb}
@@ -1,23 +1,15 @@
 import sys
 import os
-import subprocess
+import argparse
 from pathlib import Path
 import platform
 
-def run_script(script_path, *args):
-    """Run a Python script with arguments and check for errors."""
-    try:
-        result = subprocess.run(
-            [sys.executable, script_path, *args],
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        print(result.stdout)
-        return result
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {script_path} failed with exit code {e.returncode}.\n{e.stderr}")
-        raise  # Re-raise the exception to stop execution
+import DpLogPipeline
+import DpLogBatch
+import DpLogCache
+import DpLogProfile
+import DpLogFpdt
+import LogCapture
 
 def main():
     # Detect operating system
@@ -25,83 +17,88 @@ def main():
     path_example = "C:\\Logs\\dp_log1.log C:\\Logs\\dp_log2.log" if os_name == "Windows" else "/logs/dp_log1.log /logs/dp_log2.log"
 
     # Usage instructions
-    if len(sys.argv) != 3:
-        print(f"Usage: python {sys.argv[0]} LOG_FILE_1 LOG_FILE_2")
-        print("\nLOG_FILE_1 - Path to the first EDKII Dp.efi log file.")
-        print("LOG_FILE_2 - Path to the second EDKII Dp.efi log file.")
-        print(f"\nExample: python {sys.argv[0]} {path_example}")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Compare two EDKII Dp.efi log files, or build a comparison matrix of more.',
+                                     epilog=f"Example: python {sys.argv[0]} {path_example}")
+    parser.add_argument('log_files', nargs='+', metavar='LOG_FILE', help='Paths to the EDKII Dp.efi log files, in build order')
+    parser.add_argument('--baseline', type=str, default=None, help='Log file every other log is compared against (default: the first one)')
+    parser.add_argument('--html', action='store_true', help='Also write the comparison as a self-contained HTML report next to the Excel output')
+    parser.add_argument('--profile', action='store_true', help='Write per-log and per-stage timings, CPU time, peak memory and data volumes to a JSON file next to the Excel output')
+    DpLogCache.add_cache_arguments(parser)
+    args = parser.parse_args()
 
-    log_file_1 = sys.argv[1]
-    log_file_2 = sys.argv[2]
+    log_files = args.log_files
+    if len(log_files) < 2:
+        parser.error("at least two log files are required")
 
     # Validate log file extensions
-    for log_file in [log_file_1, log_file_2]:
-        if not log_file.lower().endswith('.log'):
-            print(f"Error: {log_file} must be a .log file (EDKII Dp.efi log).")
+    for log_file in log_files:
+        if not LogCapture.is_log_name(log_file) and not DpLogFpdt.is_fpdt(log_file):
+            print(f"Error: {log_file} must be a .log file (EDKII Dp.efi log), optionally compressed, or a dumped FPDT table.")
             sys.exit(1)
+    if DpLogFpdt.mixed_sources(log_files):
+        print("Error: Text Dp.efi logs and FPDT dumps name drivers and General entries differently and cannot be compared; pass only one kind.")
+        sys.exit(1)
 
-    # Extract the base names of the log files without extensions
-    base_name_1 = Path(log_file_1).stem
-    base_name_2 = Path(log_file_2).stem
-
-    # Set the output and source folder paths
+    # Set the output folder path
     output_folder = Path("Output")
-    output_folder_1 = output_folder / base_name_1
-    output_folder_2 = output_folder / base_name_2
-    source_folder = Path("Source")
-
-    # Create output folders if they do not exist
-    output_folder_1.mkdir(parents=True, exist_ok=True)
-    output_folder_2.mkdir(parents=True, exist_ok=True)
+    profiler = DpLogProfile.Profiler() if args.profile else DpLogProfile.NULL_PROFILER
 
-    # Process LOG_FILE_1
-    print(f"------ Processing {log_file_1} ------")
-    run_script(source_folder / "DpLogProcess.py", log_file_1)
-    print(f"Processing {log_file_1} completed successfully.")
-
-    # Process LOG_FILE_2
-    print(f"------ Processing {log_file_2} ------")
-    run_script(source_folder / "DpLogProcess.py", log_file_2)
-    print(f"Processing {log_file_2} completed successfully.")
+    # Process every log on a process pool, loading each one exactly once
+    print(f"------ Processing {len(log_files)} log files ------")
+    logs = [Path(log_file) for log_file in log_files]
+    with profiler.stage('process_logs', logs=len(logs)):
+        summaries = DpLogBatch.run_batch(logs, output_folder, workers=min(len(logs), os.cpu_count() or 1),
+                                         keep_tables=True, cache=DpLogCache.cache_options(args), profile=args.profile)
+    for summary in summaries:
+        if summary['tables'] is None:
+            print(f"Error: Processing {summary['log']} {summary['status']}.")
+            sys.exit(1)
+        print(f"Processing {summary['log']} completed successfully.")
 
-    # Compare Major, Drivers, PEIMs, and General
-    for section, mode in [("Major", "major"), ("Drivers", "drivers"), ("PEIMs", "peims"), ("General", "general")]:
-        print(f"------ Comparing {section} ------")
-        file1 = output_folder_1 / f"{base_name_1}_{section}.md"
-        file2 = output_folder_2 / f"{base_name_2}_{section}.md"
-        output_md = output_folder / f"{base_name_1}_{base_name_2}_{section}.md"
-        try:
-            run_script(source_folder / "CompareTime.py", mode, str(file1), str(file2), str(output_md))
-            print(f"Comparing {section} completed successfully.")
-        except subprocess.CalledProcessError:
-            print(f"Failed to compare {section}. Check the input Markdown files and try again.")
+    # Name each run after its (unique) output folder
+    tables_by_run = {Path(summary['output']).name: summary['tables'] for summary in summaries}
+    names = list(tables_by_run)
+    baseline = names[0]
+    if args.baseline is not None:
+        matches = [name for name, log in zip(names, logs) if args.baseline in (str(log), log.name, LogCapture.log_stem(log), name)]
+        if not matches:
+            print(f"Error: Baseline {args.baseline} is not one of the compared log files.")
             sys.exit(1)
+        baseline = matches[0]
+
+    # Compare Major, Drivers, PEIMs, and General on the in-memory tables
+    print("------ Comparing ------")
+    try:
+        if len(names) == 2:
+            other = names[1] if baseline == names[0] else names[0]
+            results = DpLogPipeline.compare(tables_by_run[baseline], tables_by_run[other], baseline, other, profiler)
+            excel_file = output_folder / f"{baseline}_{other}.xlsx"
+        else:
+            results = DpLogPipeline.compare_matrix(tables_by_run, baseline, profiler)
+            excel_file = output_folder / f"{baseline}_matrix_{len(names)}.xlsx"
+    except Exception as e:
+        print(f"Failed to compare: {e}. Check the input log files and try again.")
+        sys.exit(1)
+    for section, df_result in results.items():
+        print(f"------ {section} ------")
+        print(df_result.to_markdown(index=False))
+        if len(names) == 2:
+            import CompareTime
+            CompareTime.print_diff_summary(section, df_result)
 
-    # Combine all md files to Excel
+    # Combine all comparison results to Excel
     print("------ Combine All ------")
-    excel_file = output_folder / f"{base_name_1}_{base_name_2}.xlsx"
-    run_script(
-        source_folder / "MdCombineToExcel.py",
-        str(excel_file),
-        str(output_folder / f"{base_name_1}_{base_name_2}_Major.md"), "Major",
-        str(output_folder / f"{base_name_1}_{base_name_2}_Drivers.md"), "Drivers",
-        str(output_folder / f"{base_name_1}_{base_name_2}_PEIMs.md"), "PEIMs",
-        str(output_folder / f"{base_name_1}_{base_name_2}_General.md"), "General"
-    )
+    DpLogPipeline.export_excel(results, excel_file, profiler)
+    print("Combine comparison results completed successfully.")
+    if args.html:
+        DpLogPipeline.export_html(results, excel_file.with_suffix('.html'), excel_file.stem, profiler)
 
-    # Clean up temporary Markdown files
-    for md_file in [
-        output_folder / f"{base_name_1}_{base_name_2}_Major.md",
-        output_folder / f"{base_name_1}_{base_name_2}_Drivers.md",
-        output_folder / f"{base_name_1}_{base_name_2}_PEIMs.md",
-        output_folder / f"{base_name_1}_{base_name_2}_General.md"
-    ]:
-        if md_file.exists():
-            md_file.unlink()
-    print("Combine md files completed successfully.")
+    if args.profile:
+        # Worker profiles are per log; the main process covers the pool, comparison and export
+        profiler.write(excel_file.with_name(f"{excel_file.stem}_profile.json"),
+                       logs=[summary['profile'] for summary in summaries])
 
     print("Script completed successfully.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,384 @@
+import os
+import sys
+import mmap
+import struct
+import contextlib
+import argparse
+from array import array
+from collections import Counter
+
+import LogCapture
+from DpRecords import MajorPhase, PeimEntry, DriverEntry, GeneralEntry, CodedEntries
+
+# Dumps of the Firmware Basic Boot Performance Table (or of the bare EDK2 record buffer behind Dp.efi)
+FPDT_SUFFIXES = ('.fbpt', '.fpdt')
+
+# .bin names any firmware blob, so it is only taken for a whole FBPT table
+FBPT_DUMP_SUFFIX = '.bin'
+
+# FBPT header: signature and length of the whole table, records follow
+FBPT_SIGNATURE = b'FBPT'
+FBPT_HEADER = struct.Struct('<4sI')
+
+# Every record starts with Type, Length and Revision
+RECORD_HEADER = struct.Struct('<HBB')
+
+# ACPI basic boot record: Reserved, ResetEnd, OsLoaderLoadImageStart, OsLoaderStartImageStart,
+# ExitBootServicesEntry, ExitBootServicesExit (all in ns)
+BASIC_BOOT_TYPE = 0x0002
+BASIC_BOOT_RECORD = struct.Struct('<HBBIQQQQQ')
+
+# EDK2 extended records; all of them start with ProgressID, ApicID, Timestamp (ns) and a GUID
+GUID_EVENT_TYPE = 0x1010
+DYNAMIC_STRING_EVENT_TYPE = 0x1011
+DUAL_GUID_STRING_EVENT_TYPE = 0x1012
+GUID_QWORD_EVENT_TYPE = 0x1013
+GUID_QWORD_STRING_EVENT_TYPE = 0x1014
+EVENT_PREFIX = struct.Struct('<HBBHIQ16s')
+EVENT_DTYPE = [('type', '<u2'), ('length', 'u1'), ('revision', 'u1'), ('progress_id', '<u2'), ('apic_id', '<u4'),
+               ('timestamp', '<u8'), ('guid', 'V16')]
+EVENT_TYPES = frozenset([GUID_EVENT_TYPE, DYNAMIC_STRING_EVENT_TYPE, DUAL_GUID_STRING_EVENT_TYPE,
+                         GUID_QWORD_EVENT_TYPE, GUID_QWORD_STRING_EVENT_TYPE])
+
+# Offset of the ASCII string in the record types carrying one
+STRING_OFFSETS = {DYNAMIC_STRING_EVENT_TYPE: 34, DUAL_GUID_STRING_EVENT_TYPE: 50, GUID_QWORD_STRING_EVENT_TYPE: 42}
+
+# Records whose strings are gathered at once, bounding the temporary index arrays
+STRING_CHUNK_RECORDS = 8192
+
+# ProgressIDs opening a measurement and the Dp.efi token it is listed under; the closing ID is always start + 1.
+# Function, in-module and cross-module measurements are named by their own string.
+MODULE_START_ID = 0x01
+CROSSMODULE_START_ID = 0x50
+START_TOKENS = {
+    0x01: 'StartImage:',
+    0x03: 'LoadImage:',
+    0x05: 'DB:Start:',
+    0x07: 'DB:Support:',
+    0x09: 'DB:Stop:',
+    0x10: 'EventSignal:',
+    0x20: 'Callback:',
+    0x30: None,
+    0x40: None,
+    0x50: None
+}
+END_IDS = {start + 1: start for start in START_TOKENS}
+
+# Cross-module measurements that delimit the boot phases
+PHASES = ['SEC', 'PEI', 'DXE', 'BDS']
+
+def is_fpdt(path):
+    """True for a dumped FPDT boot performance table or EDK2 performance record buffer.
+
+    .fbpt and .fpdt files are taken by name, .bin files only when they start
+    with the FBPT signature.
+    """
+    name = str(path).lower()
+    if name.endswith(FPDT_SUFFIXES):
+        return True
+    if not name.endswith(FBPT_DUMP_SUFFIX):
+        return False
+    try:
+        with LogCapture.open_binary(path) as file:
+            return file.read(len(FBPT_SIGNATURE)) == FBPT_SIGNATURE
+    except Exception:
+        return False
+
+def format_guid(raw):
+    data1, data2, data3 = struct.unpack_from('<IHH', raw)
+    return f"{data1:08X}-{data2:04X}-{data3:04X}-{raw[8:10].hex().upper()}-{raw[10:].hex().upper()}"
+
+def table_bounds(buffer):
+    """(offset, end) of the records in buffer, inside the FBPT table when there is a header."""
+    if buffer[:4] == FBPT_SIGNATURE:
+        _, table_length = FBPT_HEADER.unpack_from(buffer)
+        return FBPT_HEADER.size, min(table_length, len(buffer))
+    return 0, len(buffer)
+
+def record_offsets(buffer):
+    """Offsets of the records of buffer, following the Length byte of each record header."""
+    offsets = array('q')
+    append = offsets.append
+    offset, end = table_bounds(buffer)
+    while offset + RECORD_HEADER.size <= end:
+        length = buffer[offset + 2]
+        if length < RECORD_HEADER.size or offset + length > end:
+            raise ValueError(f"record at offset {offset} has an invalid length {length}")
+        append(offset)
+        offset += length
+    return offsets
+
+def record_types(buffer):
+    """Type of every record of buffer, as an array."""
+    import numpy as np
+
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    offsets = np.frombuffer(record_offsets(buffer), dtype=np.int64)
+    return data[offsets].astype(np.int64) | data[offsets + 1].astype(np.int64) << 8
+
+def decode_strings(data, starts, sizes):
+    """Code the NUL-terminated ASCII strings at starts (at most sizes bytes each); returns (codes, strings).
+
+    Strings are gathered a chunk of records at a time into fixed-width rows
+    and coded by np.unique, so each distinct string is decoded only once.
+    """
+    import numpy as np
+
+    raw_chunks = []
+    for chunk in range(0, len(starts), STRING_CHUNK_RECORDS):
+        chunk_starts = starts[chunk:chunk + STRING_CHUNK_RECORDS]
+        chunk_sizes = sizes[chunk:chunk + STRING_CHUNK_RECORDS]
+        columns = np.arange(int(chunk_sizes.max()))
+        chars = data[np.minimum(chunk_starts[:, None] + columns, len(data) - 1)]
+        # Bytes past the record, and from the terminating NUL on, are padding
+        chars[columns >= chunk_sizes[:, None]] = 0
+        chars[np.cumsum(chars == 0, axis=1) > 0] = 0
+        raw_chunks.append(np.ascontiguousarray(chars).view(f'S{len(columns)}')[:, 0])
+    unique, inverse = np.unique(np.concatenate(raw_chunks), return_inverse=True)
+
+    # Different bytes may decode alike (errors='replace'); they are one string
+    strings = {}
+    remap = np.array([strings.setdefault(value.decode('ascii', errors='replace'), len(strings)) for value in unique.tolist()], dtype=np.int64)
+    return remap[inverse.ravel()], list(strings)
+
+def decode_events(buffer):
+    """Decode the extended records of buffer into columns; returns (events, guids, strings, basic boot record or None).
+
+    The record headers are walked once for their offsets; the fixed prefixes
+    of all event records are then gathered into one block and viewed as a
+    structured array, the vectorized counterpart of struct.iter_unpack.
+    events maps progress_id, timestamp, guid and string to arrays, the last
+    two as codes into guids (formatted) and strings.
+    """
+    import numpy as np
+
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    offsets = np.frombuffer(record_offsets(buffer), dtype=np.int64)
+    types = data[offsets].astype(np.int64) | data[offsets + 1].astype(np.int64) << 8
+    lengths = data[offsets + 2].astype(np.int64)
+
+    basic_boot_offsets = offsets[(types == BASIC_BOOT_TYPE) & (lengths >= BASIC_BOOT_RECORD.size)]
+    basic_boot = BASIC_BOOT_RECORD.unpack_from(buffer, int(basic_boot_offsets[-1])) if len(basic_boot_offsets) else None
+
+    is_event = np.isin(types, list(EVENT_TYPES)) & (lengths >= EVENT_PREFIX.size)
+    offsets, types, lengths = offsets[is_event], types[is_event], lengths[is_event]
+    prefixes = data[offsets[:, None] + np.arange(EVENT_PREFIX.size)].view(EVENT_DTYPE)[:, 0]
+
+    unique_guids, guid_codes = np.unique(prefixes['guid'], return_inverse=True)
+    guids = [format_guid(guid.tobytes()) for guid in unique_guids]
+
+    string_offsets = np.zeros(len(offsets), dtype=np.int64)
+    for record_type, string_offset in STRING_OFFSETS.items():
+        string_offsets[types == record_type] = string_offset
+    has_string = (string_offsets > 0) & (string_offsets < lengths)
+    string_codes = np.zeros(len(offsets), dtype=np.int64)
+    strings = ['']
+    if has_string.any():
+        codes, decoded = decode_strings(data, offsets[has_string] + string_offsets[has_string],
+                                        lengths[has_string] - string_offsets[has_string])
+        # Code 0 stays the empty string of the records without one
+        lookup = {'': 0}
+        remap = np.array([lookup.setdefault(string, len(lookup)) for string in decoded], dtype=np.int64)
+        string_codes[has_string] = remap[codes]
+        strings = list(lookup)
+
+    events = {
+        'progress_id': prefixes['progress_id'].astype(np.int64),
+        'timestamp': prefixes['timestamp'].astype(np.int64),
+        'guid': guid_codes.ravel().astype(np.int64),
+        'string': string_codes
+    }
+    return events, guids, strings, basic_boot
+
+def pair_events(events, n_guids, n_strings):
+    """Match every start record with its end record; returns index arrays (starts, ends) into events, by start time.
+
+    Starts and ends pair up by ProgressID, GUID and string, innermost first.
+    Records are grouped by that key with a stable sort; a start directly
+    followed by an end of its key is a pair. A key whose starts nest falls
+    back to matching with a stack.
+    """
+    import numpy as np
+
+    progress_id = events['progress_id']
+    is_start = np.isin(progress_id, list(START_TOKENS))
+    is_end = np.isin(progress_id, list(END_IDS))
+    records = np.flatnonzero(is_start | is_end)
+    start_ids = np.where(is_start, progress_id, progress_id - 1)[records]
+    keys = (start_ids * n_guids + events['guid'][records]) * n_strings + events['string'][records]
+
+    order = np.argsort(keys, kind='stable')
+    grouped_keys = keys[order]
+    grouped_starts = is_start[records][order]
+    same_key = grouped_keys[1:] == grouped_keys[:-1]
+    if np.any(same_key & grouped_starts[:-1] & grouped_starts[1:]):
+        starts, ends = stack_pairs(keys.tolist(), is_start[records].tolist())
+        starts = records[np.array(starts, dtype=np.int64)]
+        ends = records[np.array(ends, dtype=np.int64)]
+    else:
+        pairs = np.flatnonzero(same_key & grouped_starts[:-1] & ~grouped_starts[1:])
+        starts = records[order[pairs]]
+        ends = records[order[pairs + 1]]
+
+    # By start time, ties in the order their end was recorded
+    by_start = np.lexsort((ends, events['timestamp'][starts]))
+    return starts[by_start], ends[by_start]
+
+def stack_pairs(keys, is_start):
+    """Pair starts and ends of the same key with a stack per key; returns (start positions, end positions)."""
+    open_starts = {}
+    starts = []
+    ends = []
+    for position, (key, start) in enumerate(zip(keys, is_start)):
+        if start:
+            open_starts.setdefault(key, []).append(position)
+        elif open_starts.get(key):
+            starts.append(open_starts[key].pop())
+            ends.append(position)
+    return starts, ends
+
+def to_us(nanoseconds):
+    return (nanoseconds + 500) // 1000
+
+def coded_entries(entry_type, composite, make_key, times):
+    """CodedEntries of the measurements whose int64 composite keys make_key turns into key tuples.
+
+    Composite keys are coded by np.unique and renumbered in first-seen
+    order; composites naming the same key tuple share its code.
+    """
+    import numpy as np
+
+    unique, first, inverse = np.unique(composite, return_index=True, return_inverse=True)
+    keys = {}
+    remap = np.empty(len(unique), dtype=np.int64)
+    for index in np.argsort(first, kind='stable').tolist():
+        remap[index] = keys.setdefault(make_key(int(unique[index])), len(keys))
+    return CodedEntries(entry_type, list(keys), remap[inverse.ravel()], times)
+
+def build_sections(events, guids, strings, starts, ends, basic_boot=None):
+    """Turn paired measurements into the section records of the text parsers.
+
+    Module measurements inside the PEI phase become PEIMs, the other module
+    measurements Drivers, and everything else except the phase markers General.
+    """
+    import numpy as np
+
+    start_ids = events['progress_id'][starts]
+    start_times = events['timestamp'][starts]
+    times = to_us(events['timestamp'][ends] - start_times)
+    guid_codes = events['guid'][starts]
+    string_codes = events['string'][starts]
+
+    phases = {}
+    phase_codes = []
+    for phase in PHASES:
+        if phase in strings:
+            phase_codes.append(strings.index(phase))
+            markers = np.flatnonzero((start_ids == CROSSMODULE_START_ID) & (string_codes == phase_codes[-1]))
+            if len(markers):
+                phases[phase] = (int(start_times[markers[0]]), int(times[markers[0]]))
+
+    durations = {f"{phase} Phase Duration": time_us for phase, (_, time_us) in phases.items()}
+    total = [durations[f"{phase} Phase Duration"] for phase in PHASES[1:] if f"{phase} Phase Duration" in durations]
+    major = [MajorPhase('Reset End', to_us(basic_boot[4]) if basic_boot and basic_boot[4] else None)]
+    major += [MajorPhase(f"{phase} Phase Duration", durations.get(f"{phase} Phase Duration")) for phase in PHASES]
+    major.append(MajorPhase('Total Duration', sum(total) if total else None))
+
+    is_module = start_ids == MODULE_START_ID
+    in_pei = np.zeros(len(start_ids), dtype=bool)
+    if 'PEI' in phases:
+        pei_start = phases['PEI'][0]
+        pei_end = int(events['timestamp'][ends][np.flatnonzero((start_ids == CROSSMODULE_START_ID) & (string_codes == strings.index('PEI')))[0]])
+        in_pei = (start_times >= pei_start) & (start_times < pei_end)
+    is_general = ~is_module & ~((start_ids == CROSSMODULE_START_ID) & np.isin(string_codes, phase_codes))
+
+    n_guids = len(guids)
+    n_strings = len(strings)
+    peims = is_module & in_pei
+    drivers = is_module & ~in_pei
+    return {
+        'Major': major,
+        'Drivers': coded_entries(DriverEntry, string_codes[drivers] * n_guids + guid_codes[drivers],
+                                 lambda key: (strings[key // n_guids] or guids[key % n_guids], guids[key % n_guids]), times[drivers]),
+        'PEIMs': coded_entries(PeimEntry, guid_codes[peims], lambda key: (guids[key],), times[peims]),
+        'General': coded_entries(GeneralEntry, (start_ids[is_general] * n_strings + string_codes[is_general]) * n_guids + guid_codes[is_general],
+                                 lambda key: general_key(key // n_guids // n_strings, strings[key // n_guids % n_strings], guids[key % n_guids]),
+                                 times[is_general])
+    }
+
+def general_key(start_id, string, guid):
+    """(name, description) of a General measurement: its Dp.efi token and string, or its own string and GUID."""
+    token = START_TOKENS[start_id]
+    return (token or string, (string or guid) if token else guid)
+
+@contextlib.contextmanager
+def open_buffer(dump_file_path):
+    """Memory-map a dumped table as a memoryview; archive members are read into memory instead."""
+    mapped = None
+    try:
+        path, member = LogCapture.split_archive_path(dump_file_path)
+        if member is None:
+            with open(path, 'rb') as file:
+                # An empty file cannot be mapped
+                if os.fstat(file.fileno()).st_size:
+                    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            data = mapped if mapped is not None else b''
+        else:
+            with LogCapture.open_binary(dump_file_path) as file:
+                data = file.read()
+    except Exception as e:
+        print(f"Error: Failed to open {dump_file_path}. Ensure the file exists and is accessible.\n{e}")
+        sys.exit(1)
+
+    buffer = memoryview(data)
+    try:
+        yield buffer
+    finally:
+        # The map cannot be closed while a view of it is alive
+        buffer.release()
+        if mapped is not None:
+            mapped.close()
+
+def iter_sections(dump_file_path):
+    """Yield (section, records) pairs of a dumped FPDT table, with the records the text parsers produce."""
+    error = None
+    with open_buffer(dump_file_path) as buffer:
+        try:
+            events, guids, strings, basic_boot = decode_events(buffer)
+            starts, ends = pair_events(events, len(guids), len(strings))
+            sections = build_sections(events, guids, strings, starts, ends, basic_boot)
+        except (ValueError, struct.error) as e:
+            # Exit only once the map is closed; the traceback keeps views of it alive until then
+            error = str(e)
+    if error is not None:
+        print(f"Error: Failed to decode {dump_file_path}. Ensure it is a dumped FPDT boot performance table or EDK2 performance record buffer.\n{error}")
+        sys.exit(1)
+    yield from sections.items()
+
+def mixed_sources(log_files):
+    """True when log_files mix text Dp.efi logs and FPDT dumps, whose Drivers and General keys differ."""
+    return len({is_fpdt(log_file) for log_file in log_files}) > 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Decode a dumped FPDT boot performance table and summarize its records.')
+    parser.add_argument('dump_file', type=str, help='Dumped FBPT table or EDK2 performance record buffer (.fbpt, .fpdt, or .bin holding a whole FBPT table)')
+    args = parser.parse_args()
+
+    error = None
+    with open_buffer(args.dump_file) as buffer:
+        try:
+            types = record_types(buffer).tolist()
+        except ValueError as e:
+            error = str(e)
+    if error is not None:
+        print(f"Error: Failed to decode {args.dump_file}.\n{error}")
+        sys.exit(1)
+    counts = Counter(record_type for record_type in types if record_type in EVENT_TYPES)
+    print(f"{sum(counts.values())} extended records, basic boot record {'present' if BASIC_BOOT_TYPE in types else 'missing'}.")
+    for record_type, count in sorted(counts.items()):
+        print(f"  Type 0x{record_type:04X}: {count}")
+    for section, entries in iter_sections(args.dump_file):
+        print(f"{section}: {len(entries)} records")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import DpLogGenerate
+import DpLogPipeline
+
+def best_time(log_file, repeat):
+    """Best wall time of repeat capture + aggregate runs of log_file, with the tables of the last run."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tables = DpLogPipeline.load_or_aggregate(log_file)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, tables
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare parsing a text Dp.efi log with decoding a binary FPDT dump of the same size.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 500000], help='Measurements per section (default: 10000 100000 500000)')
+    parser.add_argument('--entries', type=int, default=1000, help='Distinct keys per section (default: 1000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per input, the best one counts (default: 3)')
+    args = parser.parse_args()
+
+    print('| Rows/section | Text (MB) | Text (s) | FPDT (MB) | FPDT (s) | FPDT rows/s | Speedup |')
+    print('|--------------|-----------|----------|-----------|----------|-------------|---------|')
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in args.rows:
+            log_file = Path(folder) / f"synthetic_{rows}.log"
+            fpdt_file = Path(folder) / f"synthetic_{rows}.fpdt"
+            log_bytes = DpLogGenerate.generate_log(log_file, rows=rows, entries=args.entries)
+            fpdt_bytes = DpLogGenerate.generate_fpdt(fpdt_file, rows, args.entries)
+
+            text_seconds, _ = best_time(log_file, args.repeat)
+            fpdt_seconds, tables = best_time(fpdt_file, args.repeat)
+            parsed_rows = sum(int(table.columns['Call Count'].sum()) for section, table in tables.items() if section != 'Major')
+            print(f"| {rows} | {log_bytes / 1048576:.1f} | {text_seconds:.3f} | {fpdt_bytes / 1048576:.1f} | {fpdt_seconds:.3f} | "
+                  f"{parsed_rows / fpdt_seconds:,.0f} | {text_seconds / fpdt_seconds:.2f}x |")
+
+if __name__ == "__main__":
+    main()
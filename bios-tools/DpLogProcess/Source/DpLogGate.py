@@ -0,0 +1,125 @@
+import sys
+import json
+import time
+import argparse
+
+import DpLogPipeline
+import DpLogFpdt
+import DpLogModules
+import LogCapture
+import ProcessData
+
+# Sections a budget can limit and the record fields that may name a budgeted key
+BUDGET_FIELDS = {
+    'Major': ('phase',),
+    'PEIMs': ('instance_guid',),
+    'Drivers': ('driver_name', 'description')
+}
+
+def normalize_key(key):
+    """GUIDs are matched in any case, names exactly."""
+    return key.upper() if DpLogModules.GUID_PATTERN.match(key) else key
+
+def load_budget(budget_file):
+    """Read a budget file into {section: {key: limit in us}}.
+
+    The file is a JSON object mapping Major, PEIMs and Drivers to objects of
+    key -> limit (us): Major phases as process_major_data names them, PEIM
+    instance GUIDs, and driver names or GUIDs.
+    """
+    try:
+        with open(budget_file, 'r') as file:
+            budget = json.load(file)
+    except (OSError, ValueError) as e:
+        print(f"Error: Failed to read budget {budget_file}.\n{e}")
+        sys.exit(1)
+
+    if not isinstance(budget, dict):
+        print(f"Error: Budget {budget_file} must be a JSON object of sections.")
+        sys.exit(1)
+    limits = {}
+    for section, keys in budget.items():
+        if section not in BUDGET_FIELDS or not isinstance(keys, dict):
+            print(f"Error: Budget {budget_file} section {section!r} must be one of {', '.join(BUDGET_FIELDS)} holding key: limit (us) pairs.")
+            sys.exit(1)
+        try:
+            limits[section] = {normalize_key(key): int(limit) for key, limit in keys.items()}
+        except (TypeError, ValueError) as e:
+            print(f"Error: Budget {budget_file} section {section} has a limit that is not a number of us.\n{e}")
+            sys.exit(1)
+    return limits
+
+def check_budget(log_file, limits, fail_fast=True):
+    """Evaluate limits while the log is parsed; returns ([(section, key, time_us, limit_us)], {section: keys seen}).
+
+    Times of a key add up over its calls, as in the Total Time(us) column, so
+    a limit is exceeded as soon as the running total passes it. With fail_fast
+    parsing stops at the first exceeded limit. Sections without limits are
+    skipped unparsed, and reading stops once every limited section is done.
+    """
+    parsed = DpLogFpdt.is_fpdt(log_file)
+    violations = []
+    seen = {section: set() for section in limits}
+    remaining = {section for section, section_limits in limits.items() if section_limits}
+    sections = DpLogPipeline.capture(log_file)
+    try:
+        for section, lines in sections:
+            section_limits = limits.get(section)
+            if not section_limits:
+                continue
+            fields = BUDGET_FIELDS[section]
+            totals = {}
+            for entry in (lines if parsed else ProcessData.parse_section(section, lines)):
+                for field in fields:
+                    value = getattr(entry, field)
+                    key = value if value in section_limits else value.upper()
+                    limit = section_limits.get(key)
+                    if limit is None:
+                        continue
+                    seen[section].add(key)
+                    # The time is the last field of every record
+                    if entry[-1] is not None:
+                        total = totals[key] = totals.get(key, 0) + entry[-1]
+                        if total > limit and total - entry[-1] <= limit:
+                            violations.append((section, key, total, limit))
+                            if fail_fast:
+                                return violations, seen
+                    break
+            remaining.discard(section)
+            if not remaining:
+                break
+    finally:
+        sections.close()
+    return violations, seen
+
+def main():
+    parser = argparse.ArgumentParser(description='Check a Dp.efi log against a boot-time budget and exit non-zero when a limit is exceeded.')
+    parser.add_argument('log_file', type=str, help='Path to the EDKII Dp.efi log file or dumped FPDT table')
+    parser.add_argument('budget_file', type=str, help='JSON budget: {"Major": {phase: us}, "PEIMs": {GUID: us}, "Drivers": {name or GUID: us}}')
+    parser.add_argument('--all', action='store_true', help='Report every exceeded limit instead of stopping at the first one')
+    args = parser.parse_args()
+
+    if not LogCapture.is_log_name(args.log_file) and not LogCapture.split_archive_path(args.log_file)[1] and not DpLogFpdt.is_fpdt(args.log_file):
+        print("Error: Input file must be a .log file (EDKII Dp.efi log), optionally compressed, an archive member or a dumped FPDT table.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    limits = load_budget(args.budget_file)
+    violations, seen = check_budget(args.log_file, limits, fail_fast=not args.all)
+    elapsed = time.perf_counter() - start
+
+    for section, key, total, limit in violations:
+        print(f"Budget exceeded: {section} {key}: {total} us > {limit} us")
+    if violations:
+        print(f"Budget check failed in {elapsed:.3f} s.")
+        sys.exit(1)
+
+    # A budgeted key missing from the log usually means a renamed module or a typo in the budget
+    for section, section_limits in limits.items():
+        for key in section_limits:
+            if key not in seen[section]:
+                print(f"Warning: {section} {key} of the budget was not found in {args.log_file}.")
+    print(f"Budget check passed in {elapsed:.3f} s.")
+
+if __name__ == "__main__":
+    main()
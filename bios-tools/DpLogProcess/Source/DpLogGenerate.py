@@ -0,0 +1,243 @@
+import sys
+import struct
+import argparse
+import uuid
+from pathlib import Path
+
+# Module names used to build realistic Drivers, PEIMs and General entries
+DRIVER_NAMES = [
+    "PciBusDxe", "PciHostBridgeDxe", "UsbBusDxe", "XhciDxe", "EhciDxe", "UsbKbDxe", "UsbMassStorageDxe",
+    "AhciDxe", "NvmExpressDxe", "SdMmcPciHcDxe", "DiskIoDxe", "PartitionDxe", "Fat", "GraphicsOutputDxe",
+    "ConSplitterDxe", "GraphicsConsoleDxe", "TerminalDxe", "SnpDxe", "MnpDxe", "ArpDxe", "Ip4Dxe", "Udp4Dxe",
+    "Dhcp4Dxe", "Tcp4Dxe", "HttpDxe", "TlsDxe", "SataController", "IsaAcpi", "SerialDxe", "Ps2KeyboardDxe"
+]
+GENERAL_NAMES = ["StartImage:", "LoadImage:", "DB:Start:", "DB:Support:", "BindingStart:", "Entry:"]
+
+# Phases are printed the way Dp.efi prints them (label, value, unit)
+MAJOR_PHASES = [
+    ("   Reset End:", 12000, "us"),
+    ("   SEC Phase Duration:", 3000, "us"),
+    ("   PEI Phase Duration:", 850, "ms"),
+    ("   DXE Phase Duration:", 2100, "ms"),
+    ("   BDS Phase Duration:", 700, "ms")
+]
+
+# Dp.efi right-aligns times in a field of this width (wider times push it out)
+TIME_WIDTH = 8
+
+# Rows are formatted and written this many at a time
+CHUNK_ROWS = 65536
+
+# Bytes per character of the supported encodings (generated text is ASCII)
+ENCODING_WIDTH = {'utf-8': 1, 'utf-8-sig': 1, 'utf-16': 2, 'utf-16-le': 2, 'utf-16-be': 2}
+
+def key_weights(entries, skew):
+    """Zipf weights: key k is called proportionally to 1 / (k + 1) ** skew (skew 0 is uniform)."""
+    import numpy as np
+
+    weights = 1.0 / np.arange(1, entries + 1, dtype=np.float64) ** skew
+    return weights / weights.sum()
+
+def describe(text, width):
+    """Pad text to width, first lengthening it to fill about three quarters of a wide column."""
+    words = f"manages the {text} devices and installs its protocols on every handle it binds".split()
+    description = text
+    index = 0
+    while len(description) < width * 3 // 4:
+        description += ' ' + words[index % len(words)]
+        index += 1
+    return f"{description[:width - 1]:<{width}}"
+
+def driver_keys(entries, description_width=None):
+    names = [f"{DRIVER_NAMES[i % len(DRIVER_NAMES)]}{i // len(DRIVER_NAMES) or ''}" for i in range(entries)]
+    if description_width is None:
+        return [(f"{name:<30}", f"{name + ' Driver':<32}") for name in names]
+    return [(f"{name:<30}", describe(f"{name} Driver", description_width)) for name in names]
+
+def peim_keys(entries, rng):
+    return [str(uuid.UUID(bytes=rng.bytes(16))).upper() for _ in range(entries)]
+
+def general_keys(entries, description_width=None):
+    names = [f"{GENERAL_NAMES[i % len(GENERAL_NAMES)]}{i // len(GENERAL_NAMES)}" for i in range(entries)]
+    modules = [f"Module{i // len(GENERAL_NAMES)}" for i in range(entries)]
+    if description_width is None:
+        return [(f"{name:<28}", f"{module:<40}") for name, module in zip(names, modules)]
+    return [(f"{name:<28}", describe(module, description_width)) for name, module in zip(names, modules)]
+
+def call_times(keys, key_means, rng):
+    import numpy as np
+
+    # Every key has its own typical duration, each call jitters around it
+    return np.maximum(key_means[keys] * rng.lognormal(0.0, 0.3, len(keys)), 1).astype(np.int64)
+
+def section_rows(section, entries, weights, rng, description_width=None):
+    """Yield chunks of formatted rows for one section, forever; the caller stops when it has enough.
+
+    description_width widens the Drivers and General description columns (default: 32 and 40).
+    """
+    key_means = rng.lognormal(7.0, 1.2, entries)
+    if section == 'Drivers':
+        keys = driver_keys(entries, description_width)
+        row = lambda index, key, time_us: f"  {index}:  [{index + 0x30:X}] {keys[key][0]}     {keys[key][1]} {time_us:>{TIME_WIDTH}}"
+    elif section == 'PEIMs':
+        keys = peim_keys(entries, rng)
+        row = lambda index, key, time_us: f"  {index}:   {keys[key]}   PEIM      {time_us:>{TIME_WIDTH}}"
+    else:
+        keys = general_keys(entries, description_width)
+        row = lambda index, key, time_us: f"  {index}: {keys[key][0]}     {keys[key][1]} {time_us:>{TIME_WIDTH}}"
+
+    index = 1
+    while True:
+        chunk_keys = rng.choice(entries, CHUNK_ROWS, p=weights)
+        times = call_times(chunk_keys, key_means, rng)
+        yield [row(i, key, time_us) for i, key, time_us in zip(range(index, index + CHUNK_ROWS), chunk_keys.tolist(), times.tolist())]
+        index += CHUNK_ROWS
+
+SECTION_LAYOUT = {
+    'Drivers': ("==[ Drivers by Handle ]========",
+                "Index:  Handle  Driver Name                     Description                      Time(us)"),
+    'PEIMs': ("==[ PEIMs ]========",
+              "Index   Instance GUID                       Token             Time(us)"),
+    'General': ("==[ General ]========",
+                "Index Name                     Description                              Time(us)")
+}
+
+def generate_log(output_file, size_mb=1.0, entries=1000, skew=1.0, encoding='utf-8', newline='\r\n', rows=None, seed=0,
+                 description_width=None):
+    """Write a synthetic Dp.efi log and return its size in bytes.
+
+    The Drivers, PEIMs and General sections each get a third of size_mb (or
+    exactly rows rows each), calling entries distinct keys with a Zipf(skew)
+    repetition pattern. description_width widens the description columns.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    weights = key_weights(entries, skew)
+    width = ENCODING_WIDTH[encoding]
+    section_bytes = size_mb * 1024 * 1024 / 3
+
+    with open(output_file, 'w', encoding=encoding, newline=newline) as file:
+        file.write("==[ Cumulative ]========\n"
+                   "(Times in microsec.)     Cumulative   Average     Shortest    Longest\n"
+                   "   Name          Count     Duration    Duration    Duration    Duration\n"
+                   f"{'-' * 79}\n"
+                   "          LoadImage:       120       10000         83          2         900\n\n")
+
+        file.write("==[ Major Phases ]========\n")
+        for label, value, unit in MAJOR_PHASES:
+            file.write(f"{label} {value} ({unit})\n")
+        file.write(f"Total       Duration: {sum(value for _, value, unit in MAJOR_PHASES if unit == 'ms')} (ms)\n\n")
+
+        for section, (header, columns) in SECTION_LAYOUT.items():
+            file.write(f"{header}\n{columns}\n{'-' * len(columns)}\n")
+            written_rows = 0
+            written_bytes = 0
+            for chunk in section_rows(section, entries, weights, rng, description_width):
+                if rows is not None:
+                    chunk = chunk[:rows - written_rows]
+                else:
+                    # Only write as many rows of the last chunk as the size still needs
+                    row_bytes = (sum(map(len, chunk)) / len(chunk) + len(newline)) * width
+                    chunk = chunk[:max(int((section_bytes - written_bytes) / row_bytes) + 1, 1)]
+                text = '\n'.join(chunk) + '\n'
+                file.write(text)
+                written_rows += len(chunk)
+                written_bytes += (len(text) + (len(chunk) if newline == '\r\n' else 0)) * width
+                if (written_rows >= rows) if rows is not None else (written_bytes >= section_bytes):
+                    break
+            file.write("\n")
+
+        file.write("Shell> \n")
+    return Path(output_file).stat().st_size
+
+# Measurements of the synthetic FPDT dump's General section: ProgressID and name prefix
+FPDT_GENERAL = [(0x03, "LoadImage"), (0x05, "DB:Start"), (0x07, "DB:Support"), (0x30, "Function")]
+
+def fpdt_record(progress_id, timestamp_ns, guid, string=None):
+    """Pack one EDK2 GUID event (0x1010) or, with a string, dynamic string event (0x1011) record."""
+    if string is None:
+        return struct.pack('<HBBHIQ16s', 0x1010, 34, 1, progress_id, 0, timestamp_ns, guid)
+    data = string.encode('ascii') + b'\0'
+    return struct.pack('<HBBHIQ16s', 0x1011, 34 + len(data), 1, progress_id, 0, timestamp_ns, guid) + data
+
+def generate_fpdt(output_file, rows=1000, entries=1000, skew=1.0, seed=0):
+    """Write a synthetic FPDT boot performance table dump and return its size in bytes.
+
+    It holds the SEC, PEI, DXE and BDS phase markers and rows measurements per
+    section: PEIMs inside PEI, Drivers and General inside DXE, calling entries
+    distinct keys with the same Zipf(skew) repetition pattern as generate_log.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    weights = key_weights(entries, skew)
+    peim_guids = [rng.bytes(16) for _ in range(entries)]
+    driver_guids = [rng.bytes(16) for _ in range(entries)]
+    drivers = [f"{DRIVER_NAMES[i % len(DRIVER_NAMES)]}{i // len(DRIVER_NAMES) or ''}" for i in range(entries)]
+    general = [(FPDT_GENERAL[i % len(FPDT_GENERAL)][0], driver_guids[i // len(FPDT_GENERAL)],
+                f"{FPDT_GENERAL[i % len(FPDT_GENERAL)][1]}{i // len(FPDT_GENERAL)}") for i in range(entries)]
+    phase_guid = bytes(16)
+
+    records = bytearray()
+    now = 3000000
+    records += fpdt_record(0x50, 0, phase_guid, "SEC") + fpdt_record(0x51, now, phase_guid, "SEC")
+
+    def measurements(record):
+        nonlocal now
+        key_means = rng.lognormal(7.0, 1.2, entries)
+        chosen = rng.choice(entries, rows, p=weights)
+        for key, time_us in zip(chosen.tolist(), call_times(chosen, key_means, rng).tolist()):
+            records.extend(record(key, now, now + time_us * 1000))
+            now += time_us * 1000 + 1000
+
+    for phase in ["PEI", "DXE"]:
+        records.extend(fpdt_record(0x50, now, phase_guid, phase))
+        if phase == "PEI":
+            measurements(lambda key, start, end: fpdt_record(0x01, start, peim_guids[key]) + fpdt_record(0x02, end, peim_guids[key]))
+        else:
+            measurements(lambda key, start, end: fpdt_record(0x01, start, driver_guids[key], drivers[key]) +
+                         fpdt_record(0x02, end, driver_guids[key], drivers[key]))
+            measurements(lambda key, start, end: fpdt_record(general[key][0], start, general[key][1], general[key][2]) +
+                         fpdt_record(general[key][0] + 1, end, general[key][1], general[key][2]))
+        records.extend(fpdt_record(0x51, now, phase_guid, phase))
+    records += fpdt_record(0x50, now, phase_guid, "BDS") + fpdt_record(0x51, now + 700000000, phase_guid, "BDS")
+
+    # FBPT header and the ACPI basic boot record (Reset End) ahead of the EDK2 records
+    basic_boot = struct.pack('<HBBIQQQQQ', 0x0002, 48, 2, 0, 12000000, 0, 0, 0, 0)
+    with open(output_file, 'wb') as file:
+        file.write(struct.pack('<4sI', b'FBPT', 8 + len(basic_boot) + len(records)))
+        file.write(basic_boot)
+        file.write(records)
+    return Path(output_file).stat().st_size
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic EDKII Dp.efi log for testing and benchmarking.')
+    parser.add_argument('output_file', type=str, help='Log file to write')
+    parser.add_argument('--size_mb', type=float, default=1.0, help='Approximate log size in MB (default: 1)')
+    parser.add_argument('--rows', type=int, default=None, help='Exact number of rows per section, instead of --size_mb')
+    parser.add_argument('--entries', type=int, default=1000, help='Distinct drivers, PEIMs and General entries per section (default: 1000)')
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of the call repetition; 0 calls every entry equally often (default: 1.0)')
+    parser.add_argument('--encoding', choices=list(ENCODING_WIDTH), default='utf-8', help='Text encoding (default: utf-8)')
+    parser.add_argument('--newline', choices=['crlf', 'lf'], default='crlf', help='Line ending, serial captures use CRLF (default: crlf)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--description_width', type=int, default=None, help='Width of the Drivers and General description columns, for wide-row tests (default: 32 and 40)')
+    parser.add_argument('--fpdt', action='store_true', help='Write a binary FPDT boot performance table dump (--rows measurements per section, default 1000) instead of a text log')
+    args = parser.parse_args()
+
+    if args.entries < 1:
+        print("Error: --entries must be at least 1.")
+        sys.exit(1)
+    if args.description_width is not None and args.description_width < 2:
+        print("Error: --description_width must be at least 2.")
+        sys.exit(1)
+
+    if args.fpdt:
+        size = generate_fpdt(args.output_file, args.rows or 1000, args.entries, args.skew, args.seed)
+    else:
+        size = generate_log(args.output_file, args.size_mb, args.entries, args.skew, args.encoding,
+                            '\r\n' if args.newline == 'crlf' else '\n', args.rows, args.seed, args.description_width)
+    print(f"Generated {args.output_file} ({size / (1024 * 1024):.2f} MB).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import sys
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import DpLogPipeline
+import DpLogCache
+import DpLogBatch
+import LogCapture
+from DpRecords import SECTION_KEYS
+
+# Default location of the history database
+DEFAULT_DATABASE = Path("Output") / "history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY,
+    build       TEXT NOT NULL,
+    platform    TEXT NOT NULL,
+    log_file    TEXT NOT NULL,
+    log_hash    TEXT NOT NULL UNIQUE,
+    ingested_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_platform ON runs (platform, run_id);
+
+CREATE TABLE IF NOT EXISTS entries (
+    key_id      INTEGER PRIMARY KEY,
+    section     TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    description TEXT NOT NULL,
+    UNIQUE (section, name, description)
+);
+
+CREATE TABLE IF NOT EXISTS timings (
+    key_id     INTEGER NOT NULL,
+    run_id     INTEGER NOT NULL,
+    total_us   INTEGER NOT NULL,
+    call_count INTEGER NOT NULL,
+    PRIMARY KEY (key_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS timings_run ON timings (run_id, key_id);
+"""
+
+# Latest run in the window against the average of the earlier runs in the window
+REGRESSION_QUERY = """
+WITH window_runs AS (
+    SELECT run_id FROM runs
+    WHERE (:platform IS NULL OR platform = :platform)
+    ORDER BY run_id DESC LIMIT :builds
+),
+latest AS (SELECT MAX(run_id) AS run_id FROM window_runs)
+SELECT e.section, e.name, e.description,
+       latest_timing.total_us AS latest_us,
+       AVG(previous.total_us) AS previous_us,
+       COUNT(previous.run_id) AS previous_builds
+FROM timings AS latest_timing
+JOIN entries AS e ON e.key_id = latest_timing.key_id
+JOIN timings AS previous ON previous.key_id = latest_timing.key_id
+     AND previous.run_id IN (SELECT run_id FROM window_runs)
+     AND previous.run_id <> latest_timing.run_id
+WHERE latest_timing.run_id = (SELECT run_id FROM latest)
+  AND (:section IS NULL OR e.section = :section)
+GROUP BY latest_timing.key_id
+HAVING latest_us > previous_us * (1 + :threshold / 100.0)
+ORDER BY latest_us - previous_us DESC
+LIMIT :top
+"""
+
+def connect(database=DEFAULT_DATABASE):
+    """Open (and create if needed) the history database."""
+    Path(database).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(database)
+    connection.executescript(SCHEMA)
+    return connection
+
+def table_timings(table):
+    """Yield (name, description, total_us, call_count) for each row of a SectionTable."""
+    key_columns = SECTION_KEYS[table.section]
+    names = table.columns[key_columns[0]]
+    descriptions = table.columns[key_columns[1]] if len(key_columns) > 1 else [''] * len(names)
+    totals = table.values()
+    counts = table.columns.get('Call Count', [1] * len(names))
+    for name, description, total_us, call_count in zip(names, descriptions, totals, counts):
+        # Major phases missing from the log have no duration
+        if total_us is not None:
+            yield name, description, int(total_us), int(call_count)
+
+def is_ingested(connection, log_hash):
+    """True when a log with this content hash is already a run of the history."""
+    return connection.execute("SELECT 1 FROM runs WHERE log_hash = ?", (log_hash,)).fetchone() is not None
+
+def ingest(connection, tables, build, platform, log_file, log_hash):
+    """Append one processed log as a new run; returns its run_id, or None if already ingested.
+
+    Only inserts are issued, so adding a build never rescans earlier runs.
+    """
+    with connection:
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO runs (build, platform, log_file, log_hash, ingested_at) VALUES (?, ?, ?, ?, ?)",
+            (build, platform, str(log_file), log_hash, datetime.now().isoformat(timespec='seconds'))
+        )
+        if cursor.rowcount == 0:
+            return None
+        run_id = cursor.lastrowid
+
+        for section, table in tables.items():
+            rows = list(table_timings(table))
+            connection.executemany(
+                "INSERT OR IGNORE INTO entries (section, name, description) VALUES (?, ?, ?)",
+                ((section, name, description) for name, description, _, _ in rows)
+            )
+            connection.executemany(
+                "INSERT INTO timings (key_id, run_id, total_us, call_count) "
+                "SELECT key_id, ?, ?, ? FROM entries WHERE section = ? AND name = ? AND description = ?",
+                ((run_id, total_us, call_count, section, name, description) for name, description, total_us, call_count in rows)
+            )
+    return run_id
+
+def query_regressions(connection, builds=10, threshold=10.0, top=20, section=None, platform=None):
+    """Return the entries whose latest time grew more than threshold % over the last builds runs."""
+    cursor = connection.execute(REGRESSION_QUERY, {
+        'builds': builds, 'threshold': threshold, 'top': top, 'section': section, 'platform': platform
+    })
+    return [description[0] for description in cursor.description], cursor.fetchall()
+
+def print_markdown(columns, rows):
+    print('| ' + ' | '.join(columns) + ' |')
+    print('|' + '|'.join('-' * (len(column) + 2) for column in columns) + '|')
+    for row in rows:
+        print('| ' + ' | '.join(f'{value:.1f}' if isinstance(value, float) else str(value) for value in row) + ' |')
+
+def ingest_command(args):
+    logs = DpLogBatch.collect_logs(args.logs)
+    if not logs:
+        print("Error: No .log files found.")
+        sys.exit(1)
+
+    connection = connect(args.database)
+    cache = DpLogCache.cache_options(args)
+    for log_file in logs:
+        # The content alone identifies a log, so a parser version bump does not ingest it again
+        log_hash = DpLogCache.content_hash(log_file)
+        if is_ingested(connection, log_hash):
+            print(f"Skipping {log_file}, already ingested.")
+            continue
+        tables = DpLogPipeline.load_or_aggregate(log_file, **cache, log_hash=log_hash)
+        build = args.build if args.build and len(logs) == 1 else LogCapture.log_stem(log_file)
+        run_id = ingest(connection, tables, build, args.platform, log_file, log_hash)
+        if run_id is None:
+            print(f"Skipping {log_file}, already ingested.")
+        else:
+            print(f"Ingested {log_file} as run {run_id} (build {build}, platform {args.platform or '-'}).")
+    connection.close()
+
+def regressions_command(args):
+    connection = connect(args.database)
+    start = time.perf_counter()
+    columns, rows = query_regressions(connection, args.builds, args.threshold, args.top, args.section, args.platform)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    connection.close()
+
+    print_markdown(columns, rows)
+    print(f"{len(rows)} regressions found in {elapsed_ms:.1f} ms.")
+
+def main():
+    parser = argparse.ArgumentParser(description='Store processed EDKII Dp.efi logs in a local history database and query regressions.')
+    parser.add_argument('--database', type=str, default=str(DEFAULT_DATABASE), help=f'SQLite database file (default: {DEFAULT_DATABASE})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help='Append processed logs to the history')
+    ingest_parser.add_argument('logs', nargs='+', help='Log files, directories or glob patterns in build order')
+    ingest_parser.add_argument('--build', type=str, default=None, help='Build name (default: the log file name; only used for a single log)')
+    ingest_parser.add_argument('--platform', type=str, default='', help='Platform or SKU name')
+    DpLogCache.add_cache_arguments(ingest_parser)
+    ingest_parser.set_defaults(handler=ingest_command)
+
+    query_parser = subparsers.add_parser('regressions', help='List entries whose time grew over the last builds')
+    query_parser.add_argument('--builds', type=int, default=10, help='Number of most recent builds to look at (default: 10)')
+    query_parser.add_argument('--threshold', type=float, default=10.0, help='Minimum growth in percent of the latest build over the earlier ones (default: 10)')
+    query_parser.add_argument('--top', type=int, default=20, help='Number of entries to list (default: 20)')
+    query_parser.add_argument('--section', choices=list(SECTION_KEYS), default=None, help='Only list entries of this section')
+    query_parser.add_argument('--platform', type=str, default=None, help='Only look at builds of this platform')
+    query_parser.set_defaults(handler=regressions_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import sys
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import LogCapture
+import DpLogPipeline
+import DpLogFpdt
+from MdCombineToExcel import sheet_columns
+from DpRecords import SECTION_VALUES
+
+# Bars drawn per sheet chart; the whole table stays browsable
+CHART_BARS = 20
+
+# Text columns with fewer distinct values than this share of rows are sent as a dictionary plus codes
+DICTIONARY_RATIO = 0.5
+
+def json_values(values):
+    """Plain Python values of a column; missing values (None, NaN, pandas.NA) become None."""
+    values = values.tolist() if hasattr(values, 'tolist') else list(values)
+    return [None if value is None or type(value).__name__ == 'NAType' or value != value else value for value in values]
+
+def encode_column(name, values):
+    """Encode one column as {'name', 'type': 'num' | 'text', 'values'} or, for repetitive text, {'dict', 'codes'}."""
+    values = json_values(values)
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return {'name': name, 'type': 'num', 'values': values}
+
+    values = [None if value is None else str(value) for value in values]
+    codes = {}
+    for value in values:
+        codes.setdefault(value, len(codes))
+    if len(codes) > len(values) * DICTIONARY_RATIO:
+        return {'name': name, 'type': 'text', 'values': values}
+    return {'name': name, 'type': 'text', 'dict': list(codes), 'codes': [codes[value] for value in values]}
+
+def chart_column(name, columns):
+    """The time column charted for a sheet: the section's compared time, else its first difference column."""
+    if SECTION_VALUES.get(name) in columns:
+        return SECTION_VALUES[name]
+    return next((column for column in columns if 'Difference' in column), None)
+
+def top_bars(columns, value_column, key_column, count=CHART_BARS):
+    """Pre-aggregate the chart: the count largest values of value_column as [label, value] pairs."""
+    values = json_values(columns[value_column])
+    labels = json_values(columns[key_column])
+    order = sorted((index for index, value in enumerate(values) if value is not None), key=lambda index: -values[index])
+    return [[str(labels[index]), values[index]] for index in order[:count]]
+
+def encode_sheet(name, data):
+    columns = sheet_columns(data)
+    value_column = chart_column(name, columns)
+    return {
+        'name': name,
+        'rows': len(next(iter(columns.values()), ())),
+        'chart': value_column,
+        'bars': top_bars(columns, value_column, next(iter(columns))) if value_column else [],
+        'columns': [encode_column(column, values) for column, values in columns.items()]
+    }
+
+def write_html(data_sheet_pairs, html_file, title='Dp.efi boot-time report'):
+    """Write a self-contained HTML report with one sortable, filterable table and chart per sheet.
+
+    Tables are embedded as compact column-oriented JSON and only the rows in
+    view are rendered, so 100k-row sheets stay responsive in a browser.
+    """
+    report = {
+        'title': title,
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'sheets': [encode_sheet(name, data) for data, name in data_sheet_pairs]
+    }
+    # "</" would end the script element early
+    payload = json.dumps(report, separators=(',', ':'), allow_nan=False).replace('</', '<\\/')
+    with open(html_file, 'w', encoding='utf-8') as file:
+        file.write(TEMPLATE.replace('__TITLE__', title.replace('&', '&amp;').replace('<', '&lt;')).replace('__DATA__', payload))
+
+TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font: 13px system-ui, sans-serif; margin: 16px; color: #222; }
+h1 { font-size: 18px; margin: 0 0 4px; }
+.meta { color: #777; margin-bottom: 12px; }
+.tabs button { border: 1px solid #bbb; background: #f4f4f4; padding: 4px 12px; margin-right: 4px; cursor: pointer; }
+.tabs button.active { background: #2b6cb0; color: #fff; border-color: #2b6cb0; }
+.chart { margin: 12px 0; }
+.chart text { font-size: 11px; }
+.tools { margin: 8px 0; }
+.tools input { width: 320px; padding: 4px; }
+.view { height: 60vh; overflow: auto; border: 1px solid #ccc; position: relative; }
+.row, .head { display: grid; white-space: nowrap; }
+.head { position: sticky; top: 0; background: #eee; font-weight: 600; z-index: 1; }
+.head div { cursor: pointer; user-select: none; }
+.row div, .head div { padding: 0 6px; height: 22px; line-height: 22px; overflow: hidden; text-overflow: ellipsis; border-right: 1px solid #e4e4e4; }
+.row:nth-child(even) { background: #f8f8f8; }
+.num { text-align: right; }
+</style>
+</head>
+<body>
+<h1 id="title"></h1>
+<div class="meta" id="meta"></div>
+<div class="tabs" id="tabs"></div>
+<svg class="chart" id="chart"></svg>
+<div class="tools"><input id="filter" placeholder="Filter rows (text in any column)"> <span id="count"></span></div>
+<div class="view" id="view"><div class="head" id="head"></div><div id="spacer" style="position: relative"><div id="rows" style="position: absolute; left: 0; right: 0"></div></div></div>
+<script type="application/json" id="report">__DATA__</script>
+<script>
+const ROW_HEIGHT = 22, OVERSCAN = 10;
+const report = JSON.parse(document.getElementById('report').textContent);
+const $ = id => document.getElementById(id);
+let sheet, order, sortColumn = -1, sortDescending = false;
+
+function cell(column, row) {
+  return column.codes ? column.dict[column.codes[row]] : column.values[row];
+}
+
+function prepare(sheet) {
+  // Widths, and for dictionary columns the sort rank of every entry, are computed once per sheet
+  for (const column of sheet.columns) {
+    const values = column.dict || column.values;
+    let longest = column.name.length;
+    for (const value of values) if (value !== null) longest = Math.max(longest, String(value).length);
+    column.width = Math.min(Math.max(longest * 7 + 16, 60), 480);
+    if (column.dict) {
+      const ranked = column.dict.map((value, index) => [value === null ? '' : value, index]).sort((a, b) => a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0);
+      column.rank = new Int32Array(column.dict.length);
+      ranked.forEach(([, index], rank) => { column.rank[index] = rank; });
+    }
+  }
+  sheet.template = sheet.columns.map(column => column.width + 'px').join(' ');
+  sheet.prepared = true;
+}
+
+function drawChart() {
+  const svg = $('chart'), bars = sheet.bars, width = 900, labelWidth = 260, barHeight = 16;
+  svg.innerHTML = '';
+  svg.setAttribute('width', width);
+  svg.setAttribute('height', bars.length ? bars.length * (barHeight + 4) + 24 : 0);
+  if (!bars.length) return;
+  const ns = 'http://www.w3.org/2000/svg', largest = Math.max(...bars.map(bar => Math.abs(bar[1])), 1);
+  const add = (tag, attributes, text) => {
+    const node = document.createElementNS(ns, tag);
+    for (const name in attributes) node.setAttribute(name, attributes[name]);
+    if (text !== undefined) node.textContent = text;
+    return svg.appendChild(node);
+  };
+  add('text', {x: 0, y: 14, 'font-weight': 600}, 'Top ' + bars.length + ' by ' + sheet.chart);
+  bars.forEach(([label, value], index) => {
+    const y = 24 + index * (barHeight + 4);
+    add('text', {x: labelWidth - 6, y: y + 12, 'text-anchor': 'end'}, label.length > 40 ? label.slice(0, 39) + '\\u2026' : label);
+    add('rect', {x: labelWidth, y: y, height: barHeight, width: Math.max(Math.abs(value) / largest * (width - labelWidth - 90), 1), fill: value < 0 ? '#38a169' : '#2b6cb0'});
+    add('text', {x: labelWidth + Math.abs(value) / largest * (width - labelWidth - 90) + 4, y: y + 12}, value.toLocaleString());
+  });
+}
+
+function drawHead() {
+  const head = $('head');
+  head.innerHTML = '';
+  head.style.gridTemplateColumns = sheet.template;
+  sheet.columns.forEach((column, index) => {
+    const div = head.appendChild(document.createElement('div'));
+    div.textContent = column.name + (index === sortColumn ? (sortDescending ? ' \\u25bc' : ' \\u25b2') : '');
+    div.title = column.name;
+    if (column.type === 'num') div.className = 'num';
+    div.onclick = () => sortBy(index);
+  });
+}
+
+function drawRows() {
+  const view = $('view'), rows = $('rows');
+  const first = Math.max(Math.floor(view.scrollTop / ROW_HEIGHT) - OVERSCAN, 0);
+  const last = Math.min(first + Math.ceil(view.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN, order.length);
+  rows.style.top = first * ROW_HEIGHT + 'px';
+  const fragment = document.createDocumentFragment();
+  for (let position = first; position < last; position++) {
+    const row = order[position], line = fragment.appendChild(document.createElement('div'));
+    line.className = 'row';
+    line.style.gridTemplateColumns = sheet.template;
+    for (const column of sheet.columns) {
+      const div = line.appendChild(document.createElement('div')), value = cell(column, row);
+      div.textContent = value === null ? '' : value;
+      if (column.type === 'num') div.className = 'num';
+      else div.title = div.textContent;
+    }
+  }
+  rows.replaceChildren(fragment);
+}
+
+function applyFilter() {
+  // Dictionary entries are matched once, rows then only look up their code
+  const needle = $('filter').value.trim().toLowerCase(), rows = sheet.rows;
+  let kept = new Int32Array(rows);
+  let count = 0;
+  if (!needle) {
+    for (let row = 0; row < rows; row++) kept[count++] = row;
+  } else {
+    const tests = sheet.columns.filter(column => column.type === 'text').map(column => {
+      if (column.dict) {
+        const matches = column.dict.map(value => value !== null && value.toLowerCase().includes(needle));
+        return row => matches[column.codes[row]];
+      }
+      return row => column.values[row] !== null && column.values[row].toLowerCase().includes(needle);
+    });
+    for (let row = 0; row < rows; row++) if (tests.some(test => test(row))) kept[count++] = row;
+  }
+  order = kept.subarray(0, count);
+  $('view').scrollTop = 0;
+  sortRows();
+  $('count').textContent = 'Showing ' + count.toLocaleString() + ' of ' + rows.toLocaleString() + ' rows';
+  $('spacer').style.height = count * ROW_HEIGHT + 'px';
+  $('spacer').style.width = sheet.columns.reduce((total, column) => total + column.width, 0) + 'px';
+  drawRows();
+}
+
+function sortRows() {
+  if (sortColumn < 0) return;
+  const column = sheet.columns[sortColumn], sign = sortDescending ? -1 : 1;
+  const key = column.dict ? row => column.rank[column.codes[row]] : row => column.values[row];
+  order.sort((a, b) => {
+    const x = key(a), y = key(b);
+    // Empty cells always go last
+    if (x === null || y === null) return x === null ? (y === null ? a - b : 1) : -1;
+    return x < y ? -sign : x > y ? sign : a - b;
+  });
+}
+
+function sortBy(index) {
+  sortDescending = index === sortColumn ? !sortDescending : sheet.columns[index].type === 'num';
+  sortColumn = index;
+  sortRows();
+  drawHead();
+  drawRows();
+}
+
+function show(index) {
+  sheet = report.sheets[index];
+  if (!sheet.prepared) prepare(sheet);
+  sortColumn = -1;
+  document.querySelectorAll('.tabs button').forEach((button, other) => button.classList.toggle('active', other === index));
+  $('view').scrollTop = 0;
+  drawChart();
+  drawHead();
+  applyFilter();
+}
+
+document.title = report.title;
+$('title').textContent = report.title;
+$('meta').textContent = 'Generated ' + report.generated;
+report.sheets.forEach((sheet, index) => {
+  const button = $('tabs').appendChild(document.createElement('button'));
+  button.textContent = sheet.name + ' (' + sheet.rows.toLocaleString() + ')';
+  button.onclick = () => show(index);
+});
+let pending;
+$('filter').oninput = () => { clearTimeout(pending); pending = setTimeout(applyFilter, 120); };
+$('view').onscroll = () => requestAnimationFrame(drawRows);
+if (report.sheets.length) show(0);
+</script>
+</body>
+</html>
+'''
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a self-contained HTML report of an EDKII Dp.efi log.')
+    parser.add_argument('log_file', type=str, help='Path to the EDKII Dp.efi .log file (or .log.gz/.log.xz/.log.bz2, or <archive>/<member>.log)')
+    parser.add_argument('--output', type=str, default=None, help='HTML file (default: Output/<logfile_basename>/<logfile_basename>.html)')
+    args = parser.parse_args()
+
+    if not LogCapture.is_log_name(args.log_file) and not DpLogFpdt.is_fpdt(args.log_file):
+        print("Error: Input file must be a .log file (EDKII Dp.efi log), optionally compressed, or a dumped FPDT table.")
+        sys.exit(1)
+
+    base_name = LogCapture.log_stem(args.log_file)
+    html_file = Path(args.output) if args.output else Path("Output") / base_name / f"{base_name}.html"
+    html_file.parent.mkdir(parents=True, exist_ok=True)
+    DpLogPipeline.export_html(DpLogPipeline.load_or_aggregate(args.log_file), html_file, base_name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+SOURCE_DIR = Path(__file__).resolve().parent
+
+# Libraries whose import cost should only be paid by the code paths that use them
+HEAVY_MODULES = ['numpy', 'pandas', 'openpyxl']
+
+def entry_points():
+    """Every script of this folder that can be run from the command line."""
+    return [path.stem for path in sorted(SOURCE_DIR.glob('*.py')) if '__name__ == "__main__"' in path.read_text(encoding='utf-8')]
+
+def parse_importtime(stderr, module):
+    """Return (cumulative us, heavy modules loaded, [(us, child)] direct imports) of module from -X importtime output."""
+    cumulative = None
+    heavy = set()
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue
+        # Nested imports are indented by two spaces per level, and printed before the module importing them
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if name.split('.')[0] in HEAVY_MODULES:
+            heavy.add(name.split('.')[0])
+        if depth == 0:
+            if name == module:
+                cumulative = int(cumulative_us)
+                break
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative_us), name))
+    return cumulative, sorted(heavy), sorted(children, reverse=True)
+
+def measure_import(module, repeat):
+    """Best cumulative import time of module over repeat fresh interpreters."""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=SOURCE_DIR, capture_output=True, text=True)
+        if result.returncode:
+            raise RuntimeError(f"importing {module} failed: {result.stderr.strip().splitlines()[-1]}")
+        cumulative, heavy, children = parse_importtime(result.stderr, module)
+        if best is None or cumulative < best[0]:
+            best = (cumulative, heavy, children)
+    return best
+
+def measure_help(module, repeat):
+    """Best wall time of `python <module>.py --help`, interpreter start-up included."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, f"{module}.py", '--help'], cwd=SOURCE_DIR, capture_output=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def measure_interpreter(repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], capture_output=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the import time (-X importtime) of every DpLogProcess entry point against a budget.')
+    parser.add_argument('modules', nargs='*', help='Entry points to measure (default: every script with a command line)')
+    parser.add_argument('--budget_ms', type=float, default=120.0, help='Cumulative import time allowed per entry point, in ms (default: 120)')
+    parser.add_argument('--allow_heavy', action='store_true', help='Do not fail entry points that load numpy, pandas or openpyxl at import')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh interpreters per measurement, the best one counts (default: 3)')
+    parser.add_argument('--top', type=int, default=3, help='Slowest direct imports listed per entry point (default: 3)')
+    parser.add_argument('--output', type=str, default=None, help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    modules = args.modules or entry_points()
+    interpreter_ms = measure_interpreter(args.repeat) * 1000
+    print(f"Interpreter start-up: {interpreter_ms:.1f} ms")
+
+    results = []
+    print('| Entry point | Import (ms) | --help (ms) | Heavy modules | Slowest imports (ms) | Budget |')
+    print('|-------------|-------------|-------------|---------------|----------------------|--------|')
+    for module in modules:
+        cumulative_us, heavy, children = measure_import(module, args.repeat)
+        help_ms = measure_help(module, args.repeat) * 1000
+        import_ms = cumulative_us / 1000
+        result = {
+            'module': module,
+            'import_ms': import_ms,
+            'help_ms': help_ms,
+            'heavy_modules': heavy,
+            'slowest_imports': [{'module': name, 'ms': us / 1000} for us, name in children[:args.top]],
+            'within_budget': import_ms <= args.budget_ms and (args.allow_heavy or not heavy)
+        }
+        results.append(result)
+        slowest = ', '.join(f"{name} {us / 1000:.1f}" for us, name in children[:args.top])
+        print(f"| {module} | {import_ms:.1f} | {help_ms:.1f} | {', '.join(heavy) or '-'} | {slowest or '-'} | "
+              f"{'OK' if result['within_budget'] else 'OVER'} |")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'budget_ms': args.budget_ms, 'interpreter_ms': interpreter_ms, 'results': results}, file, indent=2)
+        print(f"Results saved to: {args.output}")
+
+    over = [result['module'] for result in results if not result['within_budget']]
+    if over:
+        print(f"Error: {', '.join(over)} import in more than {args.budget_ms:g} ms or load {', '.join(HEAVY_MODULES)} at import.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
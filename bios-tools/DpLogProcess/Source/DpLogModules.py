@@ -0,0 +1,265 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+
+import DpLogCache
+
+# Bump whenever the index layout or the INF/FDF/report parsing changes
+INDEX_VERSION = 1
+
+# Folders never holding module sources
+SKIP_DIRECTORIES = {'Build', 'Conf'}
+
+GUID_PATTERN = re.compile(r'^[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}$')
+DEFINE_PATTERN = re.compile(r'^\s*(BASE_NAME|FILE_GUID)\s*=\s*(\S+)', re.IGNORECASE)
+FDF_INF_PATTERN = re.compile(r'^\s*INF\s+(.*?)(\S+\.inf)\s*$', re.IGNORECASE)
+FDF_GUID_PATTERN = re.compile(r'FILE_GUID\s*=\s*([0-9A-Fa-f-]{36})', re.IGNORECASE)
+REPORT_PATTERN = re.compile(r'^\s*(Module Name|Module INF Path|File GUID)\s*:\s*(.+?)\s*$')
+
+# Columns added to the PEIMs and Drivers tables, and the column each one is resolved from
+MODULE_COLUMNS = ['Module Name', 'Module Path']
+RESOLVED_COLUMNS = {'PEIMs': 'Instance GUID', 'Drivers': 'Driver Name'}
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as file:
+        return file.read().splitlines()
+
+def parse_inf(path, relative_path):
+    """Return [('inf', FILE_GUID, BASE_NAME, path)] for a module INF, or [] if it has no FILE_GUID."""
+    defines = {}
+    in_defines = False
+    for line in read_text(path):
+        line = line.split('#', 1)[0].strip()
+        if line.startswith('['):
+            # Only the [Defines] section names the module
+            if in_defines:
+                break
+            in_defines = line.lower().startswith('[defines')
+        elif in_defines:
+            match = DEFINE_PATTERN.match(line)
+            if match:
+                defines[match.group(1).upper()] = match.group(2)
+    guid = defines.get('FILE_GUID', '')
+    if not GUID_PATTERN.match(guid):
+        return []
+    return [('inf', guid.upper(), defines.get('BASE_NAME', Path(path).stem), relative_path)]
+
+def parse_fdf(path, relative_path):
+    """Return [('fdf', FILE_GUID override or '', INF stem, INF path)] for every INF placed in the flash."""
+    records = []
+    for line in read_text(path):
+        match = FDF_INF_PATTERN.match(line.split('#', 1)[0])
+        if match:
+            override = FDF_GUID_PATTERN.search(match.group(1))
+            inf_path = match.group(2).replace('\\', '/')
+            records.append(('fdf', override.group(1).upper() if override else '', Path(inf_path).stem, inf_path))
+    return records
+
+def parse_build_report(path, relative_path):
+    """Return [('report', File GUID, Module Name, Module INF Path)] for every module of a build -y report."""
+    records = []
+    module = {}
+    for line in read_text(path):
+        match = REPORT_PATTERN.match(line)
+        if not match:
+            continue
+        if match.group(1) == 'Module Name':
+            module = {}
+        module[match.group(1)] = match.group(2)
+        if len(module) == 3 and GUID_PATTERN.match(module['File GUID']):
+            records.append(('report', module['File GUID'].upper(), module['Module Name'], module['Module INF Path'].replace('\\', '/')))
+            module = {}
+    return records
+
+def source_files(root, old_directories, directories):
+    """Yield (path, path relative to root) of every INF and FDF under root.
+
+    A directory whose mtime is unchanged still has the same entries, so its
+    cached file and subdirectory lists are reused instead of listing it again.
+    """
+    pending = [Path(root)]
+    while pending:
+        directory = pending.pop()
+        key = str(directory)
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except OSError:
+            continue
+        entry = old_directories.get(key)
+        if entry is None or entry['mtime_ns'] != mtime_ns:
+            files = []
+            subdirectories = []
+            try:
+                with os.scandir(directory) as entries:
+                    for item in entries:
+                        if item.is_dir(follow_symlinks=False):
+                            if item.name not in SKIP_DIRECTORIES and not item.name.startswith('.'):
+                                subdirectories.append(item.name)
+                        elif item.name.lower().endswith(('.inf', '.fdf')):
+                            files.append(item.name)
+            except OSError:
+                continue
+            entry = {'mtime_ns': mtime_ns, 'files': sorted(files), 'subdirectories': sorted(subdirectories)}
+        directories[key] = entry
+
+        for name in entry['files']:
+            path = directory / name
+            yield path, path.relative_to(root).as_posix()
+        pending.extend(directory / name for name in reversed(entry['subdirectories']))
+
+def index_file_path(roots, build_reports, cache_dir=DpLogCache.DEFAULT_CACHE_DIR):
+    # One index per set of trees and reports
+    digest = hashlib.blake2b(digest_size=10)
+    for path in list(roots) + ['|'] + list(build_reports):
+        digest.update(f"{Path(path).resolve()}\0".encode())
+    return Path(cache_dir) / f"modules_{digest.hexdigest()}.json"
+
+def load_index(index_file):
+    try:
+        with open(index_file, 'r') as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('version') == INDEX_VERSION else None
+
+def save_index(index, index_file):
+    # Write to a temporary file and rename, so a concurrent run never reads a partial index
+    index_file = Path(index_file)
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=index_file.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(index, file)
+        os.replace(temp_path, index_file)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def update_index(roots, build_reports=(), cache_dir=DpLogCache.DEFAULT_CACHE_DIR):
+    """Bring the persistent index of roots and build_reports up to date and return it.
+
+    Only files whose mtime or size changed since the last run are parsed again.
+    """
+    index_file = index_file_path(roots, build_reports, cache_dir)
+    old = load_index(index_file) or {'directories': {}, 'files': {}}
+    index = {'version': INDEX_VERSION, 'directories': {}, 'files': {}}
+    parsed = 0
+
+    candidates = []
+    for root in roots:
+        candidates.extend(source_files(root, old['directories'], index['directories']))
+    candidates.extend((Path(report), Path(report).name) for report in build_reports)
+
+    for path, relative_path in candidates:
+        key = str(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        cached = old['files'].get(key)
+        if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            records = cached['records']
+        else:
+            suffix = path.suffix.lower()
+            parse = parse_inf if suffix == '.inf' else parse_fdf if suffix == '.fdf' else parse_build_report
+            records = parse(path, relative_path)
+            parsed += 1
+        index['files'][key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'records': records}
+
+    if parsed or index['files'].keys() != old['files'].keys() or index['directories'] != old['directories']:
+        save_index(index, index_file)
+    print(f"Module index: {len(index['files'])} files, {parsed} parsed ({index_file}).")
+    return index
+
+def find_inf(inf_by_path, path):
+    # FDF paths may start with a macro such as $(PLATFORM_PACKAGE)
+    parts = path.split('/')
+    for start in range(len(parts)):
+        found = inf_by_path.get('/'.join(parts[start:]))
+        if found is not None:
+            return found
+    return None
+
+def module_lookup(index):
+    """Build the {GUID or lower-case base name: (module name, INF path)} lookup table.
+
+    Build reports win over INFs placed in the flash by an FDF, which win over
+    any other INF declaring the same FILE_GUID.
+    """
+    records = [tuple(record) for entry in index['files'].values() for record in entry['records']]
+    infs = sorted((record for record in records if record[0] == 'inf'), key=lambda record: record[3])
+    inf_by_path = {}
+    for _, guid, name, path in infs:
+        # Index every path suffix, so workspace relative FDF paths match whatever folder the tree was given as
+        parts = path.split('/')
+        for start in range(len(parts)):
+            inf_by_path.setdefault('/'.join(parts[start:]), (name, guid, path))
+
+    modules = {}
+    for _, guid, name, path in infs:
+        modules.setdefault(guid, (name, path))
+        modules.setdefault(name.lower(), (name, path))
+    for _, guid, name, path in (record for record in records if record[0] == 'fdf'):
+        name, inf_guid, path = find_inf(inf_by_path, path) or (name, '', path)
+        if guid or inf_guid:
+            modules[guid or inf_guid] = (name, path)
+        modules[name.lower()] = (name, path)
+    for _, guid, name, path in (record for record in records if record[0] == 'report'):
+        modules[guid] = (name, path)
+        modules[name.lower()] = (name, path)
+    return modules
+
+def resolve(modules, key):
+    """Return (module name, INF path) for a GUID or module name, or ('', '')."""
+    key = key.strip()
+    return modules.get(key.upper() if GUID_PATTERN.match(key) else key.lower(), ('', ''))
+
+def add_module_columns(tables, modules):
+    """Insert Module Name and Module Path columns after the key of the PEIMs and Drivers tables."""
+    for section, key_column in RESOLVED_COLUMNS.items():
+        table = tables.get(section)
+        if table is None or MODULE_COLUMNS[0] in table.columns:
+            continue
+        resolved = [resolve(modules, key) for key in table.columns[key_column]]
+        columns = {}
+        for column, values in table.columns.items():
+            columns[column] = values
+            if column == table.key_columns[-1]:
+                columns[MODULE_COLUMNS[0]] = [name for name, _ in resolved]
+                columns[MODULE_COLUMNS[1]] = [path for _, path in resolved]
+        table.columns = columns
+    return tables
+
+def add_module_arguments(parser):
+    """Add the module resolution options shared by the command-line scripts."""
+    parser.add_argument('--edk2_tree', nargs='+', default=[], metavar='FOLDER', help='EDK2 workspace or package folders whose INF and FDF files name the PEIM and driver GUIDs')
+    parser.add_argument('--build_report', nargs='+', default=[], metavar='FILE', help='EDK2 build reports (build -y) naming the modules of the built platform')
+
+def module_options(args):
+    """Return the module lookup table selected on the command line, or None."""
+    if not args.edk2_tree and not args.build_report:
+        return None
+    return module_lookup(update_index(args.edk2_tree, args.build_report, getattr(args, 'cache_dir', DpLogCache.DEFAULT_CACHE_DIR)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the GUID to module index of an EDK2 tree and look up GUIDs or module names.')
+    parser.add_argument('keys', nargs='*', help='GUIDs or module names to look up')
+    add_module_arguments(parser)
+    parser.add_argument('--cache_dir', type=str, default=str(DpLogCache.DEFAULT_CACHE_DIR), help=f'Where the index is kept (default: {DpLogCache.DEFAULT_CACHE_DIR})')
+    args = parser.parse_args()
+
+    modules = module_options(args)
+    if modules is None:
+        print("Error: Give at least one --edk2_tree or --build_report.")
+        sys.exit(1)
+    for key in args.keys:
+        name, path = resolve(modules, key)
+        print(f"{key}: {name or '(unknown)'} {path}")
+
+if __name__ == "__main__":
+    main()
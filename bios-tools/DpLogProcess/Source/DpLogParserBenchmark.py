@@ -0,0 +1,46 @@
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import DpLogGenerate
+import LogCapture
+import ProcessData
+
+PARSERS = {'Drivers': ProcessData.parse_drivers_data, 'General': ProcessData.parse_general_data}
+
+def best_time(parse, lines, fixed_columns, repeat):
+    """Best wall time of repeat runs of parse, with the entries of the last run."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entries = list(parse(lines, fixed_columns))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, entries
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the fixed-column and regex parsers of Drivers and General rows as rows get wider.')
+    parser.add_argument('--widths', type=int, nargs='+', default=[32, 128, 512, 2048], help='Description column widths (default: 32 128 512 2048)')
+    parser.add_argument('--rows', type=int, default=50000, help='Rows per section (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per parser, the best one counts (default: 3)')
+    args = parser.parse_args()
+
+    print('| Section | Width | Rows | Regex (s) | Fixed columns (s) | Rows/s | Speedup |')
+    print('|---------|-------|------|-----------|-------------------|--------|---------|')
+    with tempfile.TemporaryDirectory() as folder:
+        for width in args.widths:
+            log_file = Path(folder) / f"wide_{width}.log"
+            DpLogGenerate.generate_log(log_file, rows=args.rows, description_width=width)
+            sections = {section: list(lines) for section, lines in LogCapture.iter_sections(log_file)}
+
+            for section, parse in PARSERS.items():
+                regex_seconds, regex_entries = best_time(parse, sections[section], False, args.repeat)
+                fixed_seconds, fixed_entries = best_time(parse, sections[section], True, args.repeat)
+                if fixed_entries != regex_entries:
+                    print(f"Warning: {section} rows at width {width} parse differently.")
+                print(f"| {section} | {width} | {len(fixed_entries)} | {regex_seconds:.3f} | {fixed_seconds:.3f} | "
+                      f"{len(fixed_entries) / fixed_seconds:,.0f} | {regex_seconds / fixed_seconds:.2f}x |")
+
+if __name__ == "__main__":
+    main()
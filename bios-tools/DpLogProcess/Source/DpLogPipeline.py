@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""In-process Dp.efi log pipeline: capture -> parse -> aggregate -> export.
+
+Every stage runs in the calling interpreter and hands its result to the next
+one in memory, so processing a log costs a single Python start-up.
+"""
+
+import importlib
+from pathlib import Path
+
+import DpLogFpdt
+import LogCapture
+import ProcessData
+from DpLogProfile import NULL_PROFILER
+
+# Sections in the order they are processed and written to Excel
+SECTIONS = ["Major", "Drivers", "PEIMs", "General"]
+
+def capture(log_file):
+    """Stream a Dp.efi log as (section, lines) pairs in a single pass.
+
+    A dumped FPDT table is decoded instead, yielding (section, records) pairs.
+    """
+    if DpLogFpdt.is_fpdt(log_file):
+        return DpLogFpdt.iter_sections(log_file)
+    return LogCapture.iter_sections(log_file)
+
+def aggregate(sections, profiler=NULL_PROFILER, time_column=None, max_samples=ProcessData.DEFAULT_MAX_SAMPLES, parsed=False):
+    """Parse and merge each captured section into {section: SectionTable}.
+
+    time_column optionally adds a bounded per-call column (see ProcessData.merge_data).
+    parsed marks sections that already hold records (as captured from an FPDT dump).
+    """
+    tables = {}
+    with profiler.stage('capture_and_aggregate'):
+        for section, lines in sections:
+            with profiler.stage(f'section:{section}', section=section) as record:
+                if parsed:
+                    record['records'] = len(lines)
+                    tables[section] = ProcessData.process_entries(section, lines, time_column, max_samples)
+                else:
+                    tables[section] = ProcessData.process_section(section, profiler.count_lines(lines, record), time_column, max_samples)
+                record['rows'] = len(tables[section])
+
+    # Keep the report order stable regardless of the order sections appear in the log
+    for section in SECTIONS:
+        if section not in tables:
+            print(f"Error: {section} section not found, skipping {section} processing.")
+    return {section: tables[section] for section in SECTIONS if section in tables}
+
+def export_markdown(tables, output_folder, base_name, profiler=NULL_PROFILER):
+    """Write each table to <output_folder>/<base_name>_<section>.md."""
+    for section, table in tables.items():
+        output_md_file = Path(output_folder) / f"{base_name}_{section}.md"
+        with profiler.stage(f'export_markdown:{section}', section=section, rows=len(table)) as record:
+            ProcessData.write_markdown_table(table, output_md_file)
+        if record:
+            record['bytes'] = output_md_file.stat().st_size
+
+def export_excel(tables, excel_file, profiler=NULL_PROFILER):
+    """Write each table (SectionTable or DataFrame) to its own sheet of excel_file."""
+    import MdCombineToExcel
+
+    with profiler.stage('import_openpyxl'):
+        importlib.import_module('openpyxl')
+
+    with profiler.stage('export_excel', rows=sum(len(table) for table in tables.values())) as record:
+        MdCombineToExcel.write_excel([(table, section) for section, table in tables.items()], excel_file)
+    if record:
+        record['bytes'] = Path(excel_file).stat().st_size
+    print(f"Excel file saved to: {excel_file}")
+
+def export_html(tables, html_file, title, profiler=NULL_PROFILER):
+    """Write every table (SectionTable or DataFrame) to a self-contained, browsable HTML report."""
+    import DpLogHtml
+
+    with profiler.stage('export_html', rows=sum(len(table) for table in tables.values())) as record:
+        DpLogHtml.write_html([(table, section) for section, table in tables.items()], html_file, title)
+    if record:
+        record['bytes'] = Path(html_file).stat().st_size
+    print(f"HTML report saved to: {html_file}")
+
+def compare(tables1, tables2, name1, name2, profiler=NULL_PROFILER):
+    """Compare the sections present in both logs, returning {section: DataFrame}."""
+    import CompareTime
+
+    with profiler.stage('import_pandas'):
+        importlib.import_module('pandas')
+
+    results = {}
+    for section in SECTIONS:
+        if section in tables1 and section in tables2:
+            with profiler.stage(f'compare:{section}', section=section, rows=len(tables1[section]) + len(tables2[section])):
+                results[section] = CompareTime.compare_tables(tables1[section], tables2[section], name1, name2)
+    return results
+
+def compare_matrix(tables_by_run, baseline=None, profiler=NULL_PROFILER):
+    """Compare any number of runs, returning {section: wide DataFrame} against the baseline run.
+
+    tables_by_run maps run name -> {section: SectionTable} in build order.
+    """
+    import CompareTime
+
+    with profiler.stage('import_pandas'):
+        importlib.import_module('pandas')
+
+    results = {}
+    for section in SECTIONS:
+        section_tables = {name: tables[section] for name, tables in tables_by_run.items() if section in tables}
+        if len(section_tables) > 1:
+            with profiler.stage(f'compare:{section}', section=section, rows=sum(len(table) for table in section_tables.values())):
+                results[section] = CompareTime.compare_matrix_tables(section_tables, baseline)
+    return results
+
+def load_or_aggregate(log_file, cache_dir=None, cache_size_mb=None, profiler=NULL_PROFILER, time_column=None,
+                      max_samples=ProcessData.DEFAULT_MAX_SAMPLES, log_hash=None):
+    """Return the log's tables from the parse cache, parsing and caching them on a miss.
+
+    log_hash, the DpLogCache.content_hash of the log, saves hashing it again when already known.
+    """
+    parsed = DpLogFpdt.is_fpdt(log_file)
+    if cache_dir is None:
+        return aggregate(capture(log_file), profiler, time_column, max_samples, parsed)
+
+    import DpLogCache
+
+    with profiler.stage('cache_lookup', bytes=LogCapture.input_size(log_file)) as record:
+        # Tables with a time column are cached apart from the plain ones
+        key = DpLogCache.cache_key(log_file, f"{time_column}:{max_samples}" if time_column else None, log_hash)
+        tables = DpLogCache.load(cache_dir, key)
+        record['hit'] = tables is not None
+    if tables is not None:
+        print(f"Using cached results for {log_file}.")
+        return tables
+
+    tables = aggregate(capture(log_file), profiler, time_column, max_samples, parsed)
+    if cache_size_mb is None:
+        cache_size_mb = DpLogCache.DEFAULT_CACHE_SIZE_MB
+    with profiler.stage('cache_store'):
+        DpLogCache.store(cache_dir, key, tables, cache_size_mb)
+    return tables
+
+def add_module_columns(tables, modules):
+    """Add module name and path columns resolved through a DpLogModules lookup table."""
+    import DpLogModules
+
+    return DpLogModules.add_module_columns(tables, modules)
+
+def print_summary(table, top=10):
+    """Print the first rows of a table as Markdown."""
+    columns = table.column_names
+    print(f"------ {table.section} ({len(table)} rows) ------")
+    print('| ' + ' | '.join(columns) + ' |')
+    print('|' + '|'.join('-' * (len(column) + 2) for column in columns) + '|')
+    for row, _ in zip(table.rows(), range(top)):
+        print('| ' + ' | '.join(map(str, row)) + ' |')
+
+def follow_log(log_file, output_folder=None, poll_interval=0.5, idle_timeout=None, on_section=print_summary,
+               time_column=None, max_samples=ProcessData.DEFAULT_MAX_SAMPLES, modules=None, excel=True, html=False,
+               profiler=NULL_PROFILER):
+    """Process a log while it is still being captured.
+
+    Each section is parsed as its lines arrive and handed to on_section as
+    soon as the line ending it is written. Markdown (and optionally Excel and
+    HTML) outputs are written once the capture stops growing for idle_timeout
+    seconds (or on Ctrl+C). A growing log is never looked up in the parse
+    cache. Returns {section: SectionTable}.
+    """
+    base_name = LogCapture.log_stem(log_file)
+    output_folder = Path(output_folder) if output_folder else Path("Output") / base_name
+
+    tables = {}
+    print(f"Following {log_file}, press Ctrl+C to stop...")
+    try:
+        for section, lines in LogCapture.split_sections(LogCapture.follow_lines(log_file, poll_interval, idle_timeout)):
+            with profiler.stage(f'section:{section}', section=section) as record:
+                tables[section] = ProcessData.process_section(section, profiler.count_lines(lines, record), time_column, max_samples)
+                record['rows'] = len(tables[section])
+            if modules is not None:
+                add_module_columns({section: tables[section]}, modules)
+            on_section(tables[section])
+    except KeyboardInterrupt:
+        print("Stopped following.")
+
+    tables = {section: tables[section] for section in SECTIONS if section in tables}
+    if tables:
+        output_folder.mkdir(parents=True, exist_ok=True)
+        export_markdown(tables, output_folder, base_name, profiler)
+        if excel:
+            export_excel(tables, output_folder / f"{base_name}.xlsx", profiler)
+        if html:
+            export_html(tables, output_folder / f"{base_name}.html", base_name, profiler)
+    return tables
+
+def process_log(log_file, output_folder=None, markdown=True, excel=True, cache_dir=None, cache_size_mb=None,
+                profiler=NULL_PROFILER, time_column=None, max_samples=ProcessData.DEFAULT_MAX_SAMPLES, modules=None,
+                html=False, log_hash=None):
+    """Run the whole pipeline for one log and return its {section: SectionTable}.
+
+    Markdown, Excel and HTML are optional sinks written to output_folder, which
+    defaults to Output/<logfile_basename>. When cache_dir is given, parsed
+    results are reused for logs whose content was seen before. Stage timings
+    are recorded on profiler (see DpLogProfile). time_column optionally adds a
+    bounded per-call column (see ProcessData.merge_data). modules, a lookup
+    table from DpLogModules, adds module name and path columns to the PEIMs
+    and Drivers tables. log_hash is passed on to load_or_aggregate.
+    """
+    base_name = LogCapture.log_stem(log_file)
+    output_folder = Path(output_folder) if output_folder else Path("Output") / base_name
+    if markdown or excel or html:
+        output_folder.mkdir(parents=True, exist_ok=True)
+
+    print("Running LogCapture and processing sections...")
+    tables = load_or_aggregate(log_file, cache_dir, cache_size_mb, profiler, time_column, max_samples, log_hash)
+    print("LogCapture completed successfully.")
+
+    if modules is not None:
+        with profiler.stage('resolve_modules'):
+            add_module_columns(tables, modules)
+
+    if markdown:
+        export_markdown(tables, output_folder, base_name, profiler)
+
+    if excel:
+        print("Combining tables to Excel...")
+        export_excel(tables, output_folder / f"{base_name}.xlsx", profiler)
+
+    if html:
+        export_html(tables, output_folder / f"{base_name}.html", base_name, profiler)
+
+    return tables
@@ -1,23 +1,26 @@
 import sys
-import os
-import subprocess
-import shutil
-from pathlib import Path
+import argparse
 import platform
+from pathlib import Path
 
-def run_script(script_path, *args):
-    """Run a Python script with arguments and check for errors."""
-    try:
-        result = subprocess.run(
-            [sys.executable, script_path, *args],
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        print(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {script_path} encountered an issue.\n{e.stderr}")
-        sys.exit(e.returncode)
+import DpLogPipeline
+import DpLogCache
+import DpLogProfile
+import ProcessData
+import DpLogTrace
+import DpLogFpdt
+import DpLogModules
+import LogCapture
+
+def write_extras(args, log_file, profiler):
+    """Write the --trace timeline and the --profile report of a processed log."""
+    base_name = LogCapture.log_stem(log_file)
+    if args.trace:
+        with profiler.stage('export_trace') as record:
+            record['events'] = DpLogTrace.export_trace(log_file, Path("Output") / base_name / f"{base_name}.trace.json")
+    if args.profile:
+        profiler.write(Path("Output") / base_name / f"{base_name}_profile.json",
+                       log=str(log_file), log_bytes=LogCapture.input_size(log_file))
 
 def main():
     # Detect operating system
@@ -25,67 +28,57 @@ def main():
     path_example = "C:\\Logs\\dp_log.log" if os_name == "Windows" else "/logs/dp_log.log"
 
     # Check if a log file parameter was provided
-    if len(sys.argv) != 2:
-        print("Error: No log file provided.")
-        print(f"Usage: python {sys.argv[0]} LOG_FILE")
-        print(f"Example: python {sys.argv[0]} {path_example}")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Process an EDKII Dp.efi log file into Markdown and Excel reports.',
+                                     epilog=f"Example: python {sys.argv[0]} {path_example}")
+    parser.add_argument('log_file', type=str, help='Path to the EDKII Dp.efi .log file, a .log.gz/.log.xz/.log.bz2, a zip or tar archive of logs, or <archive>/<member>.log')
+    parser.add_argument('--follow', action='store_true', help='Parse the log while it is still being captured, printing each section as it ends')
+    parser.add_argument('--idle_timeout', type=float, default=None, help='With --follow, stop once the log has not grown for this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--poll_interval', type=float, default=0.5, help='With --follow, seconds between checks for new data (default: 0.5)')
+    parser.add_argument('--profile', action='store_true', help='Write per-stage timings, CPU time, peak memory and data volumes to a JSON file next to the Excel output')
+    parser.add_argument('--no_excel', action='store_true', help='Only write the Markdown tables, skipping the Excel workbook (and the openpyxl and pandas imports)')
+    parser.add_argument('--html', action='store_true', help='Also write a self-contained HTML report (<logfile_basename>.html) with sortable, filterable tables and charts')
+    parser.add_argument('--trace', action='store_true', help='Also write a Chrome trace / Perfetto timeline (<logfile_basename>.trace.json) next to the Excel output')
+    ProcessData.add_time_column_arguments(parser)
+    DpLogModules.add_module_arguments(parser)
+    DpLogCache.add_cache_arguments(parser)
+    args = parser.parse_args()
 
-    log_file = sys.argv[1]
+    log_file = args.log_file
     # Validate log file extension
-    if not log_file.lower().endswith('.log'):
-        print("Error: Input file must be a .log file (EDKII Dp.efi log).")
+    if not LogCapture.is_log_name(log_file) and not LogCapture.is_archive(log_file) and not DpLogFpdt.is_fpdt(log_file):
+        print("Error: Input file must be a .log file (EDKII Dp.efi log), a compressed .log, a zip/tar archive of logs or a dumped FPDT table (.fbpt, .fpdt, or .bin starting with FBPT).")
         sys.exit(1)
+    if args.trace and DpLogFpdt.is_fpdt(log_file):
+        print("Error: --trace needs a text Dp.efi log.")
+        sys.exit(1)
+    if args.follow and (not log_file.lower().endswith('.log') or LogCapture.split_archive_path(log_file)[1] is not None):
+        print("Error: --follow needs a plain .log file that is still being written.")
+        sys.exit(1)
+    if args.follow and (args.cache_dir != str(DpLogCache.DEFAULT_CACHE_DIR) or args.cache_size_mb != DpLogCache.DEFAULT_CACHE_SIZE_MB):
+        parser.error("--follow never uses the parse cache; --cache_dir and --cache_size_mb do not apply")
 
-    # Extract the base name of the log file without the extension
-    base_name = Path(log_file).stem
-    # Set the output and source folder paths
-    output_folder = Path("Output") / base_name
-    source_folder = Path("Source")
-
-    # Create the output folder if it does not exist
-    output_folder.mkdir(parents=True, exist_ok=True)
-
-    # LogCapture
-    print("Running LogCapture...")
-    run_script(source_folder / "LogCapture.py", log_file)
-
-    # Move the generated files to the output folder
-    for file in ["Major.txt", "General.txt", "Drivers.txt", "PEIMs.txt"]:
-        if os.path.exists(file):
-            shutil.move(file, output_folder / f"{base_name}_{file}")
-        else:
-            print(f"Warning: {file} not found, skipping move.")
-
-    print("LogCapture completed successfully.")
-
-    # Process Major, Drivers, PEIMs, and General
-    for section in ["Major", "Drivers", "PEIMs", "General"]:
-        print(f"Processing {section}...")
-        input_file = output_folder / f"{base_name}_{section}.txt"
-        output_md = output_folder / f"{base_name}_{section}.md"
-        if input_file.exists():
-            run_script(source_folder / "ProcessData.py", str(input_file), "--output_md_file", str(output_md))
-            print(f"ProcessData {section} completed successfully.")
-        else:
-            print(f"Error: {input_file} not found, skipping {section} processing.")
-
-    # Combine md files to Excel
-    print("Combining Markdown files to Excel...")
-    excel_file = output_folder / f"{base_name}.xlsx"
-    run_script(
-        source_folder / "MdCombineToExcel.py",
-        str(excel_file),
-        str(output_folder / f"{base_name}_Major.md"), "Major",
-        str(output_folder / f"{base_name}_Drivers.md"), "Drivers",
-        str(output_folder / f"{base_name}_PEIMs.md"), "PEIMs",
-        str(output_folder / f"{base_name}_General.md"), "General"
-    )
-
-    # Clean up temporary text files
-    for txt_file in output_folder.glob("*.txt"):
-        txt_file.unlink()
-    print("Combine md files completed successfully.")
+    # Run capture, parse, aggregate and export in this interpreter
+    profiler = DpLogProfile.Profiler() if args.profile else DpLogProfile.NULL_PROFILER
+    with profiler.stage('module_index'):
+        modules = DpLogModules.module_options(args)
+    if args.follow:
+        DpLogPipeline.follow_log(log_file, poll_interval=args.poll_interval, idle_timeout=args.idle_timeout,
+                                 time_column=args.time_column, max_samples=args.max_samples, modules=modules,
+                                 excel=not args.no_excel, html=args.html, profiler=profiler)
+        write_extras(args, log_file, profiler)
+    else:
+        # An archive is processed one log member at a time, each into its own output folder
+        log_files = LogCapture.archive_members(log_file) if LogCapture.is_archive(log_file) else [log_file]
+        if not log_files:
+            print(f"Error: {log_file} holds no .log files.")
+            sys.exit(1)
+        for log_file in log_files:
+            if len(log_files) > 1:
+                print(f"------ Processing {log_file} ------")
+                profiler = DpLogProfile.Profiler() if args.profile else DpLogProfile.NULL_PROFILER
+            DpLogPipeline.process_log(log_file, excel=not args.no_excel, html=args.html, profiler=profiler, time_column=args.time_column,
+                                      max_samples=args.max_samples, modules=modules, **DpLogCache.cache_options(args))
+            write_extras(args, log_file, profiler)
 
     print("Script completed successfully.")
 
@@ -0,0 +1,101 @@
+import sys
+import json
+import time
+import contextlib
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def peak_rss_kb():
+    """Peak resident set size of this process so far in KB, or None where unavailable."""
+    # Linux keeps ru_maxrss across fork and exec, so a spawned worker would report its parent's peak;
+    # VmHWM belongs to this process image only
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+class Profiler:
+    """Collects wall time, CPU time, peak RSS and data volumes per pipeline stage."""
+
+    def __init__(self):
+        self.stages = []
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        """Time the enclosed block; the yielded dict can be updated with counters such as rows."""
+        record = {'stage': name, **fields}
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall, 6)
+            record['cpu_seconds'] = round(time.process_time() - cpu, 6)
+            record['peak_rss_kb'] = peak_rss_kb()
+            self.stages.append(record)
+
+    def count_lines(self, lines, record):
+        """Pass lines through, adding lines, bytes and the time spent producing them to record."""
+        record.setdefault('lines', 0)
+        record.setdefault('bytes', 0)
+        record.setdefault('capture_seconds', 0.0)
+        iterator = iter(lines)
+        while True:
+            start = time.perf_counter()
+            try:
+                line = next(iterator)
+            except StopIteration:
+                record['capture_seconds'] += time.perf_counter() - start
+                return
+            record['capture_seconds'] += time.perf_counter() - start
+            record['lines'] += 1
+            # Decoded characters plus the newline; equals the UTF-8 size for the ASCII text Dp.efi prints
+            record['bytes'] += len(line) + 1
+            yield line
+
+    def report(self, **fields):
+        """Return the profile as a JSON-serialisable dict."""
+        for record in self.stages:
+            # Split section time into reading/splitting the log and parsing/aggregating it
+            if 'capture_seconds' in record:
+                record['capture_seconds'] = round(record['capture_seconds'], 6)
+                record['parse_seconds'] = round(max(record['wall_seconds'] - record['capture_seconds'], 0.0), 6)
+        return {
+            **fields,
+            'stages': self.stages,
+            'total': {
+                'wall_seconds': round(time.perf_counter() - self.start_wall, 6),
+                'cpu_seconds': round(time.process_time() - self.start_cpu, 6),
+                'peak_rss_kb': peak_rss_kb()
+            }
+        }
+
+    def write(self, path, **fields):
+        with open(path, 'w') as file:
+            json.dump(self.report(**fields), file, indent=2, default=str)
+        print(f"Profile saved to: {path}")
+
+class NullProfiler(Profiler):
+    """Profiler stand-in that records nothing, used when --profile is off."""
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        yield {}
+
+    def count_lines(self, lines, record):
+        return lines
+
+NULL_PROFILER = NullProfiler()
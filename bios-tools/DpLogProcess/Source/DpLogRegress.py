@@ -0,0 +1,68 @@
+import sys
+import argparse
+from pathlib import Path
+
+import DpLogPipeline
+import DpLogBatch
+import DpLogCache
+import DpLogFpdt
+from DpRecords import SECTION_KEYS
+
+def load_boots(logs, cache):
+    """Process boot logs on the pool (no per-log outputs) and return {boot name: tables}."""
+    summaries = DpLogBatch.run_batch(logs, 'Output', keep_tables=True, cache=cache, outputs=False)
+    for summary in summaries:
+        if summary['tables'] is None:
+            print(f"Error: Processing {summary['log']} {summary['status']}.")
+            sys.exit(1)
+    return {summary['log']: summary['tables'] for summary in summaries}
+
+def section_frames(boots, section):
+    import CompareTime
+
+    return {name: CompareTime.key_value_frame(tables[section]) for name, tables in boots.items() if section in tables}
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect statistically significant boot-time regressions between two builds with several boots each.')
+    parser.add_argument('--baseline', nargs='+', required=True, help='Dp.efi logs, directories or glob patterns of the baseline build boots')
+    parser.add_argument('--candidate', nargs='+', required=True, help='Dp.efi logs, directories or glob patterns of the candidate build boots')
+    parser.add_argument('--alpha', type=float, default=0.05, help='False discovery rate across all keys of a section (default: 0.05)')
+    parser.add_argument('--min_difference', type=float, default=0, help='Minimum median increase in us to report (default: 0)')
+    parser.add_argument('--output', type=str, default=str(Path("Output") / "regressions.xlsx"), help='Excel report (default: Output/regressions.xlsx)')
+    DpLogCache.add_cache_arguments(parser)
+    args = parser.parse_args()
+
+    baseline_logs = DpLogBatch.collect_logs(args.baseline)
+    candidate_logs = DpLogBatch.collect_logs(args.candidate)
+    if len(baseline_logs) < 2 or len(candidate_logs) < 2:
+        print("Error: At least two boots per build are required.")
+        sys.exit(1)
+    if DpLogFpdt.mixed_sources(baseline_logs + candidate_logs):
+        print("Error: Text Dp.efi logs and FPDT dumps name drivers and General entries differently and cannot be compared; pass only one kind.")
+        sys.exit(1)
+
+    cache = DpLogCache.cache_options(args)
+    print(f"------ Processing {len(baseline_logs)} baseline and {len(candidate_logs)} candidate boots ------")
+    baseline = load_boots(baseline_logs, cache)
+    candidate = load_boots(candidate_logs, cache)
+
+    # One vectorized test over all keys of each section; pandas is only loaded once there are boots to test
+    import CompareTime
+
+    results = {}
+    for section in SECTION_KEYS:
+        baseline_frames = section_frames(baseline, section)
+        candidate_frames = section_frames(candidate, section)
+        if len(baseline_frames) < 2 or len(candidate_frames) < 2:
+            continue
+        results[section] = CompareTime.detect_regressions(section, baseline_frames, candidate_frames, args.alpha, args.min_difference)
+        print(f"------ {section}: {len(results[section])} significant regressions ------")
+        if len(results[section]):
+            print(results[section].to_markdown(index=False))
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    DpLogPipeline.export_excel(results, args.output)
+    print("Script completed successfully.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import sys
+import gzip
+import json
+import argparse
+from pathlib import Path
+
+import LogCapture
+import ProcessData
+
+# One timeline track (Chrome trace thread) per section
+TRACKS = {'Major': 1, 'PEIMs': 2, 'Drivers': 3, 'General': 4}
+TRACK_NAMES = {'Major': 'Major Phases', 'PEIMs': 'PEIMs', 'Drivers': 'Drivers by Handle', 'General': 'General'}
+BOOT_PID = 1
+
+# Major phases in boot order, and the phase each record section runs in
+PHASES = ['SEC Phase Duration', 'PEI Phase Duration', 'DXE Phase Duration', 'BDS Phase Duration']
+SECTION_PHASE = {'PEIMs': 'PEI Phase Duration', 'Drivers': 'DXE Phase Duration', 'General': 'DXE Phase Duration'}
+
+def phase_starts(phases):
+    """Lay the Major phases end to end after Reset End; returns ({phase: start_us}, [events])."""
+    durations = {phase.phase: phase.duration_us for phase in phases}
+    now = durations.get('Reset End') or 0
+    starts = {}
+    events = []
+    for phase in PHASES:
+        starts[phase] = now
+        if durations.get(phase) is not None:
+            events.append(trace_event(phase.replace(' Duration', ''), 'Major', now, durations[phase]))
+            now += durations[phase]
+
+    # Total Duration covers PEI through BDS
+    if durations.get('Total Duration') is not None:
+        events.insert(0, trace_event('Total', 'Major', starts['PEI Phase Duration'], durations['Total Duration']))
+    return starts, events
+
+def trace_event(name, section, start_us, duration_us, **args):
+    event = {'name': name, 'cat': section, 'ph': 'X', 'ts': start_us, 'dur': duration_us, 'pid': BOOT_PID, 'tid': TRACKS[section]}
+    if args:
+        event['args'] = args
+    return event
+
+def metadata_events():
+    yield {'name': 'process_name', 'ph': 'M', 'pid': BOOT_PID, 'args': {'name': 'Boot'}}
+    for section, tid in TRACKS.items():
+        yield {'name': 'thread_name', 'ph': 'M', 'pid': BOOT_PID, 'tid': tid, 'args': {'name': TRACK_NAMES[section]}}
+        yield {'name': 'thread_sort_index', 'ph': 'M', 'pid': BOOT_PID, 'tid': tid, 'args': {'sort_index': tid}}
+
+def section_events(section, lines, start_us):
+    """Yield one event per PEIM, Driver or General record, back to back from start_us in log order."""
+    now = start_us
+    if section == 'PEIMs':
+        for index, entry in enumerate(ProcessData.parse_peims_data(lines), start=1):
+            yield trace_event(entry.instance_guid, section, now, entry.time_us, index=index)
+            now += entry.time_us
+    elif section == 'Drivers':
+        for index, entry in enumerate(ProcessData.parse_drivers_data(lines), start=1):
+            yield trace_event(entry.driver_name, section, now, entry.time_us, description=entry.description, index=index)
+            now += entry.time_us
+    elif section == 'General':
+        for index, entry in enumerate(ProcessData.parse_general_data(lines), start=1):
+            yield trace_event(entry.name, section, now, entry.time_us, description=entry.description, index=index)
+            now += entry.time_us
+
+def trace_events(sections):
+    """Turn captured (section, lines) pairs into Chrome trace events, one section at a time.
+
+    Dp.efi only reports durations, so records are placed back to back in log
+    order inside the phase they run in (PEIMs in PEI, Drivers and General in
+    DXE); parallel work shows up as records spilling past their phase.
+    """
+    yield from metadata_events()
+    starts = {}
+    for section, lines in sections:
+        if section == 'Major':
+            starts, events = phase_starts(ProcessData.parse_major_data(lines))
+            yield from events
+        else:
+            yield from section_events(section, lines, starts.get(SECTION_PHASE[section], 0))
+
+def write_trace(events, trace_file):
+    """Stream events into a Chrome Trace Event JSON file (gzip-compressed for .gz), one event per line."""
+    opener = gzip.open if str(trace_file).endswith('.gz') else open
+    count = 0
+    with opener(trace_file, 'wt', encoding='utf-8') as file:
+        file.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+        for event in events:
+            if count:
+                file.write(',\n')
+            file.write(json.dumps(event, separators=(',', ':')))
+            count += 1
+        file.write('\n]}\n')
+    return count
+
+def export_trace(log_file, trace_file):
+    """Write the timeline of a Dp.efi log as Chrome trace JSON, loadable in Perfetto or chrome://tracing."""
+    count = write_trace(trace_events(LogCapture.iter_sections(log_file)), trace_file)
+    print(f"Trace file with {count} events saved to: {trace_file}")
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Export an EDKII Dp.efi log as a Chrome trace / Perfetto timeline.')
+    parser.add_argument('log_file', type=str, help='Path to the EDKII Dp.efi .log file (or .log.gz/.log.xz/.log.bz2, or <archive>/<member>.log)')
+    parser.add_argument('--output', type=str, default=None, help='Trace file, .json or .json.gz (default: Output/<logfile_basename>/<logfile_basename>.trace.json)')
+    args = parser.parse_args()
+
+    if not LogCapture.is_log_name(args.log_file):
+        print("Error: Input file must be a .log file (EDKII Dp.efi log), optionally compressed.")
+        sys.exit(1)
+
+    base_name = LogCapture.log_stem(args.log_file)
+    trace_file = Path(args.output) if args.output else Path("Output") / base_name / f"{base_name}.trace.json"
+    trace_file.parent.mkdir(parents=True, exist_ok=True)
+    export_trace(args.log_file, trace_file)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import DpLogBatch
+import DpLogCache
+import DpLogFpdt
+import LogCapture
+
+# Results of every log, as one JSON object per line, and the seen-content state surviving restarts
+RESULTS_FILE = 'watch.jsonl'
+STATE_FILE = 'watch_state.json'
+
+def warm_worker():
+    """Pool initializer: pay the interpreter and library import cost once per worker, not once per log.
+
+    The pipeline imports NumPy and openpyxl lazily, so they are imported here
+    explicitly; the watch path never compares, so pandas is not needed.
+    """
+    import numpy
+    import openpyxl
+    import DpLogPipeline
+    import MdCombineToExcel
+
+def ping():
+    # Holding the worker a moment spreads the start-up pings over every worker of the pool
+    time.sleep(0.1)
+    return os.getpid()
+
+def watch_one(log_file, output_folder, cache, log_hash=None):
+    """Worker entry point: process one log, without sending its tables back."""
+    return DpLogBatch.process_one(log_file, output_folder, cache, log_hash=log_hash)
+
+def scan(folder, recursive=False):
+    """Return {path: (size, mtime_ns)} of the logs and archives in folder."""
+    files = {}
+    for path in sorted(Path(folder).glob('**/*' if recursive else '*')):
+        if LogCapture.is_log_name(path) or LogCapture.is_archive(path) or DpLogFpdt.is_fpdt(path):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+def load_state(state_file):
+    try:
+        with open(state_file, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {'logs': {}, 'files': {}}
+
+def save_state(state, state_file):
+    temp_file = Path(f"{state_file}.tmp")
+    with open(temp_file, 'w') as file:
+        json.dump(state, file)
+    os.replace(temp_file, state_file)
+
+class Watcher:
+    """Watch a folder and process every log dropped into it on a pool of pre-warmed workers.
+
+    A file is taken once its size and mtime stop changing for settle seconds.
+    Logs whose content was processed before (under any name) are reported as
+    duplicates instead of being processed again; the content is hashed on a
+    thread, so a large log does not hold up the other logs in flight, and the
+    hash is handed to the worker for the parse cache. Every log gets a result line
+    within budget seconds of being taken: the real result when it is done in
+    time, otherwise an OVER BUDGET line at its deadline followed by the real
+    result once it arrives.
+    """
+
+    def __init__(self, folder, output_folder='Output', workers=None, budget=60.0, settle=2.0, cache=None, recursive=False):
+        self.folder = Path(folder)
+        self.output_folder = Path(output_folder)
+        self.workers = workers or os.cpu_count() or 1
+        self.budget = budget
+        self.settle = settle
+        self.cache = cache
+        self.recursive = recursive
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        self.state_file = self.output_folder / STATE_FILE
+        self.state = load_state(self.state_file)
+        self.used = {Path(entry['output']).name for entry in self.state['logs'].values()}
+        self.changing = {}
+        self.hashing = {}
+        self.queue = deque()
+        self.running = {}
+        self.pending = {}
+        self.late = set()
+        self.summaries = []
+
+    def emit(self, result):
+        result['time'] = time.time()
+        with open(self.output_folder / RESULTS_FILE, 'a') as file:
+            file.write(json.dumps(result) + '\n')
+        latency = result.get('latency_seconds')
+        print(f"{result['status']:<12} {result['log']}" + (f" ({latency:.2f} s)" if latency is not None else ''))
+
+    def take(self, path, size, mtime_ns, hasher):
+        """Start hashing a settled file (every log member of an archive) on hasher to skip content already seen."""
+        self.state['files'][str(path)] = [size, mtime_ns]
+        try:
+            logs = DpLogBatch.expand_archive(path)
+        except Exception as e:
+            self.emit({'log': str(path), 'status': 'FAILED', 'error': str(e)})
+            return
+        now = time.monotonic()
+        for log in logs:
+            self.hashing[hasher.submit(DpLogCache.content_hash, log)] = (log, now)
+
+    def hashed(self, future):
+        """Queue a hashed log unless its content was seen before."""
+        log, taken = self.hashing.pop(future)
+        try:
+            log_hash = future.result()
+        except Exception as e:
+            self.late.discard(log)
+            self.emit({'log': str(log), 'status': 'FAILED', 'error': str(e)})
+            return
+        key = DpLogCache.cache_key(log, log_hash=log_hash)
+        first = self.state['logs'][key]['log'] if key in self.state['logs'] else self.pending.get(key)
+        if first is not None:
+            self.late.discard(log)
+            self.emit({'log': str(log), 'status': 'DUPLICATE', 'duplicate_of': str(first)})
+            return
+        self.pending[key] = log
+        self.queue.append((log, key, log_hash, taken))
+
+    def poll_folder(self, hasher):
+        now = time.monotonic()
+        files = scan(self.folder, self.recursive)
+        for path, signature in files.items():
+            if self.state['files'].get(str(path)) == list(signature):
+                continue
+            seen = self.changing.get(path)
+            if seen is None or seen[0] != signature:
+                self.changing[path] = (signature, now)
+            elif now - seen[1] >= self.settle:
+                del self.changing[path]
+                self.take(path, *signature, hasher)
+        for path in set(self.changing) - set(files):
+            del self.changing[path]
+
+    def dispatch(self, executor):
+        # At most one log per worker is in flight, so a log is never stuck behind a deep pool queue
+        while self.queue and len(self.running) < self.workers:
+            log, key, log_hash, taken = self.queue.popleft()
+            folder = DpLogBatch.assign_output_folders([log], self.output_folder, self.used)[log]
+            self.running[executor.submit(watch_one, log, folder, self.cache, log_hash)] = (log, key, taken)
+
+    def in_flight(self):
+        """(log, taken) of every log being hashed, queued or processed."""
+        return ([(log, taken) for log, taken in self.hashing.values()] +
+                [(log, taken) for log, _, _, taken in self.queue] +
+                [(log, taken) for log, _, taken in self.running.values()])
+
+    def collect(self, timeout):
+        """Wait up to timeout for hashes and results, emitting finished logs and logs past their deadline."""
+        # Wake up for the next deadline, not just the next scan
+        deadlines = [taken + self.budget - time.monotonic() for log, taken in self.in_flight() if log not in self.late]
+        timeout = max(min([timeout] + deadlines), 0.01)
+        done = set()
+        if self.running or self.hashing:
+            done, _ = wait(list(self.running) + list(self.hashing), timeout=timeout, return_when=FIRST_COMPLETED)
+        else:
+            time.sleep(timeout)
+        now = time.monotonic()
+        for future in [future for future in done if future in self.hashing]:
+            self.hashed(future)
+        done = {future for future in done if future in self.running}
+        for future in done:
+            log, key, taken = self.running.pop(future)
+            del self.pending[key]
+            summary = future.result()
+            self.summaries.append(summary)
+            self.state['logs'][key] = {'log': summary['log'], 'output': summary['output'], 'status': summary['status']}
+            late = log in self.late
+            self.late.discard(log)
+            self.emit({'log': summary['log'], 'status': summary['status'] + (' (LATE)' if late else ''),
+                       'output': summary['output'], 'sections': summary['sections'], 'total_us': summary['total_us'],
+                       'process_seconds': summary['seconds'], 'latency_seconds': now - taken})
+
+        # Logs still hashing, queued or running past their deadline get their result line now
+        for log, taken in self.in_flight():
+            if log not in self.late and now - taken > self.budget:
+                self.late.add(log)
+                self.emit({'log': str(log), 'status': 'OVER BUDGET', 'latency_seconds': now - taken})
+        return done
+
+    def run(self, poll_interval=1.0, idle_timeout=None):
+        """Watch until Ctrl+C, or until nothing arrived or ran for idle_timeout seconds."""
+        print(f"Watching {self.folder} with {self.workers} workers, press Ctrl+C to stop...")
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker) as executor, \
+                ThreadPoolExecutor(max_workers=self.workers) as hasher:
+            # Start and warm every worker before the first log arrives
+            for future in [executor.submit(ping) for _ in range(self.workers)]:
+                future.result()
+            print("Workers ready.")
+
+            idle_since = time.monotonic()
+            try:
+                while True:
+                    self.poll_folder(hasher)
+                    self.dispatch(executor)
+                    if self.collect(poll_interval):
+                        save_state(self.state, self.state_file)
+                        DpLogBatch.write_index(self.summaries, self.output_folder / 'index.md')
+                    if self.hashing or self.queue or self.running or self.changing:
+                        idle_since = time.monotonic()
+                    elif idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                        break
+            except KeyboardInterrupt:
+                print("Stopped watching.")
+            save_state(self.state, self.state_file)
+        return self.summaries
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch a folder and process every EDKII Dp.efi log dropped into it on pre-warmed workers.')
+    parser.add_argument('folder', type=str, help='Folder the logs (or compressed logs and zip/tar archives of logs) arrive in')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--output_folder', type=str, default='Output', help='Root folder for per-log outputs, results and state (default: Output)')
+    parser.add_argument('--budget', type=float, default=60.0, help='Seconds from a log being taken to its result line; late logs are reported at the deadline (default: 60)')
+    parser.add_argument('--settle', type=float, default=2.0, help='Seconds a file must stop changing before it is taken (default: 2)')
+    parser.add_argument('--poll_interval', type=float, default=1.0, help='Seconds between folder scans (default: 1)')
+    parser.add_argument('--idle_timeout', type=float, default=None, help='Stop once nothing has arrived or run for this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--recursive', action='store_true', help='Also watch subfolders')
+    DpLogCache.add_cache_arguments(parser)
+    args = parser.parse_args()
+
+    if not Path(args.folder).is_dir():
+        print(f"Error: {args.folder} is not a folder.")
+        sys.exit(1)
+
+    watcher = Watcher(args.folder, args.output_folder, args.workers, args.budget, args.settle,
+                      DpLogCache.cache_options(args), args.recursive)
+    watcher.run(args.poll_interval, args.idle_timeout)
+
+if __name__ == "__main__":
+    main()
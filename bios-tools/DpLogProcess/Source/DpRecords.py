@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+# Raw entries produced by the section parsers (namedtuples carry no per-instance __dict__)
+MajorPhase = namedtuple('MajorPhase', ['phase', 'duration_us'])
+PeimEntry = namedtuple('PeimEntry', ['instance_guid', 'time_us'])
+DriverEntry = namedtuple('DriverEntry', ['driver_name', 'description', 'time_us'])
+GeneralEntry = namedtuple('GeneralEntry', ['name', 'description', 'time_us'])
+
+# Key columns identifying a row of each section
+SECTION_KEYS = {
+    'Major': ['Phase'],
+    'Drivers': ['Driver Name', 'Description'],
+    'PEIMs': ['Instance GUID'],
+    'General': ['Name', 'Description']
+}
+
+# Column holding the time compared between logs for each section
+SECTION_VALUES = {
+    'Major': 'Duration (us)',
+    'Drivers': 'Total Time(us)',
+    'PEIMs': 'Total Time(us)',
+    'General': 'Total Time(us)'
+}
+
+class CodedEntries:
+    """Entries of one section already split into key codes and times, as decoded from binary input.
+
+    keys lists the key tuple of each code in first-seen order, codes and
+    times are equal-length int64 arrays. Iterating yields entry_type records
+    like the text parsers do; merging uses the codes directly.
+    """
+    __slots__ = ('entry_type', 'keys', 'codes', 'times')
+
+    def __init__(self, entry_type, keys, codes, times):
+        self.entry_type = entry_type
+        self.keys = keys
+        self.codes = codes
+        self.times = times
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        entry_type = self.entry_type
+        keys = self.keys
+        for code, time_us in zip(self.codes.tolist(), self.times.tolist()):
+            yield entry_type(*keys[code], time_us)
+
+class SectionTable:
+    """Column-oriented table of one processed Dp section.
+
+    columns maps each column name to a sequence of equal length: lists for
+    text columns and NumPy arrays for the aggregated time statistics.
+    """
+    __slots__ = ('section', 'columns')
+
+    def __init__(self, section, columns):
+        self.section = section
+        self.columns = columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    @property
+    def column_names(self):
+        return list(self.columns)
+
+    @property
+    def key_columns(self):
+        return SECTION_KEYS[self.section]
+
+    @property
+    def value_column(self):
+        return SECTION_VALUES[self.section]
+
+    def keys(self):
+        """Iterate the key tuple of each row."""
+        return zip(*(self.columns[column] for column in self.key_columns))
+
+    def values(self):
+        """Return the compared time column."""
+        return self.columns[self.value_column]
+
+    def rows(self):
+        """Iterate rows as tuples in column order."""
+        return zip(*self.columns.values())
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
@@ -1,64 +1,284 @@
 # -*- coding: utf-8 -*-
 
+import os
+import io
 import sys
-import re
 import argparse
+import re
+import time
+import codecs
+import contextlib
+import importlib
+from pathlib import Path
+from itertools import groupby
+
+# Section header markers and the section name each one starts
+SECTION_HEADERS = {
+    "==[ Major Phases ]========": "Major",
+    "==[ Drivers by Handle ]========": "Drivers",
+    "==[ PEIMs ]========": "PEIMs",
+    "==[ General ]========": "General"
+}
+
+# Any Dp.efi section header (including ones we do not extract) ends the current section
+SECTION_MARKER = "==["
+
+# UEFI shell prompt such as "FS0:\>" printed once Dp.efi returns
+SHELL_PROMPT = re.compile(r'^FS\d+:\S*>')
+
+# Compressed single logs, decompressed while they are read; modules are imported on first use
+COMPRESSED_MODULES = {'.gz': 'gzip', '.xz': 'lzma', '.bz2': 'bz2'}
+LOG_SUFFIXES = ('.log.gz', '.log.xz', '.log.bz2', '.log')
+
+# Bundles of many logs; a member is addressed as <archive>/<member path>
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2', '.tbz2')
 
 def check_python_version():
     # Ensure the script is running with Python 3
     if sys.version_info[0] < 3:
         raise RuntimeError("This script requires Python 3.x")
 
-def extract_sections(log_file_path):
-    # Try reading the file with UTF-8 encoding, fall back to UTF-16 if there's a decode error
-    try:
-        with open(log_file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-    except UnicodeDecodeError:
+def detect_encoding(head):
+    """Detect the encoding of a Dp.efi log from its first bytes."""
+    # Check the byte order mark first
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+        return 'utf-16'
+
+    # Without a BOM, ASCII text saved as UTF-16 has a NUL in every other byte
+    if b'\x00' in head:
+        odd_nuls = head[1::2].count(b'\x00')
+        even_nuls = head[0::2].count(b'\x00')
+        return 'utf-16-le' if odd_nuls >= even_nuls else 'utf-16-be'
+    return 'utf-8'
+
+def is_log_name(path):
+    """True for a .log file, plain or compressed (.log.gz, .log.xz, .log.bz2)."""
+    return str(path).lower().endswith(LOG_SUFFIXES)
+
+def is_archive(path):
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+def log_stem(path):
+    """Log name without its folders, .log suffix and compression suffix."""
+    name = Path(path).name
+    for suffix in LOG_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(path).stem
+
+def split_archive_path(path):
+    """Split <archive>/<member> into (archive, member); other paths give (path, None)."""
+    path = Path(path)
+    if not path.exists():
+        for parent in path.parents:
+            if is_archive(parent) and parent.is_file():
+                return parent, path.relative_to(parent).as_posix()
+    return path, None
+
+def archive_members(archive):
+    """Return the <archive>/<member> paths of the logs in a zip or tar archive, in archive order."""
+    import zipfile
+    import tarfile
+
+    if str(archive).lower().endswith('.zip'):
+        with zipfile.ZipFile(archive) as bundle:
+            names = [info.filename for info in bundle.infolist() if not info.is_dir()]
+    else:
+        with tarfile.open(archive, 'r:*') as bundle:
+            names = [member.name for member in bundle.getmembers() if member.isfile()]
+    return [Path(archive) / name for name in names if is_log_name(name)]
+
+def input_size(log_file_path):
+    """Bytes a log takes in storage: its file size, or the stored size of an archive member."""
+    path, member = split_archive_path(log_file_path)
+    if member is None:
+        return os.path.getsize(path)
+    import zipfile
+    import tarfile
+
+    if str(path).lower().endswith('.zip'):
+        with zipfile.ZipFile(path) as bundle:
+            return bundle.getinfo(member).compress_size
+    with tarfile.open(path, 'r:*') as bundle:
+        return bundle.getmember(member).size
+
+def read_errors():
+    # Decoding and decompression errors, only of the archive and compression modules already in use
+    errors = [UnicodeError, EOFError, OSError]
+    for module, error in (('zipfile', 'BadZipFile'), ('tarfile', 'TarError'), ('lzma', 'LZMAError')):
+        if module in sys.modules:
+            errors.append(getattr(sys.modules[module], error))
+    return tuple(errors)
+
+@contextlib.contextmanager
+def open_binary(log_file_path):
+    """Open a log, compressed log or archive member as a stream of decompressed bytes.
+
+    Members and compressed data are decompressed as they are read, without temporary files.
+    """
+    path, member = split_archive_path(log_file_path)
+    with contextlib.ExitStack() as stack:
+        if member is None:
+            stream = stack.enter_context(open(path, 'rb'))
+        elif str(path).lower().endswith('.zip'):
+            import zipfile
+            stream = stack.enter_context(stack.enter_context(zipfile.ZipFile(path)).open(member))
+        else:
+            import tarfile
+            stream = stack.enter_context(stack.enter_context(tarfile.open(path, 'r:*')).extractfile(member))
+
+        # A compressed log, on its own or inside an archive
+        name = member or path.name
+        module = COMPRESSED_MODULES.get(Path(name).suffix.lower())
+        if module is not None and not is_archive(name):
+            stream = stack.enter_context(importlib.import_module(module).open(stream, 'rb'))
+        yield stream
+
+@contextlib.contextmanager
+def open_log(log_file_path):
+    """Open a Dp.efi log (plain, compressed or an archive member) as text, detecting its encoding once from the first bytes."""
+    with contextlib.ExitStack() as stack:
         try:
-            with open(log_file_path, 'r', encoding='utf-16') as file:
-                content = file.read()
+            binary = stack.enter_context(open_binary(log_file_path))
+            head = binary.peek(256)[:256]
         except Exception as e:
-            print(f"Error: Failed to read {log_file_path}. Ensure it is a valid EDKII Dp.efi log file in UTF-8 or UTF-16 encoding.\n{e}")
+            print(f"Error: Failed to open {log_file_path}. Ensure the file exists and is accessible.\n{e}")
             sys.exit(1)
-    except Exception as e:
-        print(f"Error: Failed to open {log_file_path}. Ensure the file exists and is accessible.\n{e}")
-        sys.exit(1)
+        yield stack.enter_context(io.TextIOWrapper(binary, encoding=detect_encoding(head), errors='replace'))
 
-    # Define the section titles and their corresponding regular expressions
-    sections = {
-        "Major": r'==\[ Major Phases \]========(.*?)(?==\[|$)',
-        "Drivers": r'==\[ Drivers by Handle \]========(.*?)(?==\[|$)',
-        "PEIMs": r'==\[ PEIMs \]========(.*?)(?==\[|$)',
-        "General": r'==\[ General \]========(.*?)(?==\[|$)'
-    }
+def is_section_end(line):
+    # Any Dp.efi header, or the UEFI shell prompt coming back, ends the current section
+    stripped = line.lstrip()
+    return SECTION_MARKER in line or stripped.startswith('Shell>') or SHELL_PROMPT.match(stripped) is not None
 
-    # Check if any sections were found
-    sections_found = False
-    # Extract each section and write it to a corresponding .txt file
-    for section, pattern in sections.items():
-        match = re.search(pattern, content, re.DOTALL)
-        if match:
-            sections_found = True
-            section_content = match.group(1).strip()
-            with open(f"{section}.txt", 'w', encoding='utf-8') as file:
-                file.write(section_content)
-        else:
-            print(f"Warning: No content found for section '{section}' in {log_file_path}. Ensure the log contains '==[{section} ]========'.")
+def tag_section_lines(lines):
+    """Yield (section, line) for every line; section is None outside the extracted sections."""
+    section = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if is_section_end(line):
+            # A header line starts a new section; unknown headers and prompts end the current one
+            section = next((name for header, name in SECTION_HEADERS.items() if header in line), None)
+            yield None, line
+            continue
+        yield section, line
+
+def split_sections(lines):
+    """Group a line stream into (section, lines) pairs, one per extracted section.
+
+    Each section's lines are a lazy stream that must be consumed before advancing;
+    a section is complete as soon as the line that ends it has been read.
+    """
+    for section, tagged_lines in groupby(tag_section_lines(lines), key=lambda item: item[0]):
+        if section is not None:
+            yield section, (line for _, line in tagged_lines)
+
+def iter_sections(log_file_path):
+    """Walk a Dp.efi log once and yield (section, lines) for each section found.
+
+    lines is a lazy stream over the section body and must be consumed before
+    advancing to the next section, so memory stays flat regardless of log size.
+    """
+    sections_found = set()
+    with open_log(log_file_path) as file:
+        try:
+            for section, lines in split_sections(file):
+                sections_found.add(section)
+                yield section, lines
+        except read_errors() as e:
+            print(f"Error: Failed to read {log_file_path}. Ensure it is a valid EDKII Dp.efi log file in UTF-8 or UTF-16 encoding, "
+                  f"and that compressed logs and archives are not truncated.\n{e}")
+            sys.exit(1)
+
+    for header, section in SECTION_HEADERS.items():
+        if section not in sections_found:
+            print(f"Warning: No content found for section '{section}' in {log_file_path}. Ensure the log contains '{header}'.")
 
+    # Check if any sections were found
     if not sections_found:
         print(f"Error: No valid EDKII Dp.efi sections found in {log_file_path}. Expected sections: Major Phases, Drivers, PEIMs, General.")
         sys.exit(1)
 
+def follow_lines(log_file_path, poll_interval=0.5, idle_timeout=None):
+    """Yield complete lines of a log that is still being captured, waiting for more data.
+
+    Stops once the file has not grown for idle_timeout seconds (never if None).
+    The encoding is detected from the first bytes written and decoding is
+    incremental, so a read ending in the middle of a line or character is
+    completed by the next one.
+    """
+    idle = 0.0
+    head = b''
+    decoder = None
+    pending = ''
+    file = None
+    try:
+        while True:
+            chunk = b''
+            if file is None:
+                try:
+                    file = open(log_file_path, 'rb')
+                except FileNotFoundError:
+                    pass
+            if file is not None:
+                chunk = file.read(1024 * 1024)
+
+            if chunk:
+                idle = 0.0
+                if decoder is None:
+                    # Wait for a few bytes so the BOM or NUL pattern can be recognised
+                    head += chunk
+                    if len(head) < 4:
+                        continue
+                    decoder = codecs.getincrementaldecoder(detect_encoding(head))(errors='replace')
+                    chunk = head
+                pending += decoder.decode(chunk)
+                *lines, pending = pending.split('\n')
+                for line in lines:
+                    yield line
+                continue
+
+            if idle_timeout is not None and idle >= idle_timeout:
+                break
+            time.sleep(poll_interval)
+            idle += poll_interval
+    finally:
+        if file is not None:
+            file.close()
+
+    # Flush whatever is left once the capture stopped growing
+    if decoder is None and head:
+        decoder = codecs.getincrementaldecoder(detect_encoding(head))(errors='replace')
+        pending += decoder.decode(head)
+    if decoder is not None:
+        pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+def extract_sections(log_file_path, output_folder='.'):
+    # Stream each section found in the log to a corresponding .txt file in output_folder
+    for section, lines in iter_sections(log_file_path):
+        with open(Path(output_folder) / f"{section}.txt", 'w', encoding='utf-8') as file:
+            # Drop leading blank lines so the section header row comes first
+            for line in lines:
+                if line.strip():
+                    file.write(line.strip() + '\n')
+                    break
+            for line in lines:
+                file.write(line + '\n')
+
 if __name__ == "__main__":
     check_python_version()
-    
+
     # Set up command line argument parser
     parser = argparse.ArgumentParser(description="Extract sections from an EDKII Dp.efi log file into separate .txt files.")
     parser.add_argument('log_file', type=str, help='Path to the EDKII Dp.efi .log file to process')
-    
+    parser.add_argument('--output_folder', type=str, default='.', help='Folder to write the section .txt files to (default: current directory)')
+
     # Parse command line arguments
     args = parser.parse_args()
-    
+
     # Extract sections from the specified .log file
-    extract_sections(args.log_file)
\ No newline at end of file
+    extract_sections(args.log_file, args.output_folder)
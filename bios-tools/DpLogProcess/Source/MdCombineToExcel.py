@@ -1,26 +1,42 @@
-import pandas as pd
 import sys
 import os
 
-def adjust_column_width(writer, sheet_name):
-    workbook = writer.book
-    worksheet = workbook[sheet_name]
+from DpRecords import SectionTable
 
-    for column in worksheet.columns:
-        max_length = 0
-        column_letter = column[0].column_letter  # Get the column name
+def column_width(name, values):
+    """Width fitting the header and the longest value, computed on the whole column at once."""
+    import numpy as np
 
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
+    values = np.asarray(values)
+    if len(values) == 0:
+        longest = 0
+    elif values.dtype.kind in 'iu':
+        # The widest integer is always the smallest or the largest one
+        longest = max(len(str(values.min())), len(str(values.max())))
+    else:
+        longest = int(np.char.str_len(values.astype(str)).max())
+    return max(len(str(name)), longest) + 2
+
+def sheet_columns(data):
+    """Return {column name: values} for a DataFrame or a SectionTable."""
+    if isinstance(data, SectionTable):
+        return data.columns
+    return {name: data[name].to_numpy() for name in data.columns}
 
-        adjusted_width = max_length + 2
-        worksheet.column_dimensions[column_letter].width = adjusted_width
+def excel_value(value):
+    # Write-only worksheets accept plain Python scalars; missing values (None, NaN, pandas.NA) become empty cells
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    # NumPy scalars, recognized without importing NumPy for every cell
+    if type(value).__module__ == 'numpy':
+        return value.item()
+    if type(value).__name__ == 'NAType':
+        return None
+    return value
 
 def read_md_to_df(file_path):
+    import pandas as pd
+
     try:
         # Read the Markdown file
         df = pd.read_csv(file_path, delimiter='|', skipinitialspace=True)
@@ -37,13 +53,28 @@ def read_md_to_df(file_path):
         print(f"Error reading file: {e}")
         return pd.DataFrame()
 
+def write_excel(data_sheet_pairs, output_file='merged_file.xlsx'):
+    # Stream each DataFrame or SectionTable to its own sheet of a write-only workbook
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    for data, sheet_name in data_sheet_pairs:
+        columns = sheet_columns(data)
+        worksheet = workbook.create_sheet(title=sheet_name)
+
+        # Column widths must be known before the first row is streamed out
+        for index, (name, values) in enumerate(columns.items(), start=1):
+            worksheet.column_dimensions[get_column_letter(index)].width = column_width(name, values)
+
+        worksheet.append(list(columns))
+        for row in zip(*columns.values()):
+            worksheet.append([excel_value(value) for value in row])
+    workbook.save(output_file)
+
 def merge_md_files(file_sheet_pairs, output_file='merged_file.xlsx'):
-    # Create a new Excel file and write each file to a different sheet
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        for file, sheet_name in file_sheet_pairs:
-            df = read_md_to_df(file)
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-            adjust_column_width(writer, sheet_name)
+    # Read each Markdown file and write it to a different sheet
+    write_excel([(read_md_to_df(file), sheet_name) for file, sheet_name in file_sheet_pairs], output_file)
 
     print(f"Markdown files have been merged into '{output_file}'")
 
@@ -55,6 +86,6 @@ if __name__ == "__main__":
         # Get the output file name and the file-sheet pairs from command line arguments
         output_file = sys.argv[1]
         file_sheet_pairs = [(sys.argv[i], sys.argv[i + 1]) for i in range(2, len(sys.argv) - 1, 2)]
-        
+
         # Merge the Markdown files
         merge_md_files(file_sheet_pairs, output_file)
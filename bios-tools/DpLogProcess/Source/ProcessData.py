@@ -3,138 +3,154 @@
 import sys
 import argparse
 import re
-import pandas as pd
-from collections import defaultdict
+from array import array
+from collections import Counter
+from itertools import chain, islice
+
+from DpRecords import MajorPhase, PeimEntry, DriverEntry, GeneralEntry, SectionTable, CodedEntries, SECTION_KEYS
+
+# Bump whenever parsing or aggregation output changes, so cached results are not reused
+PARSER_VERSION = 3
+
+# Statistic columns emitted per key for Drivers, PEIMs and General
+STATISTIC_COLUMNS = ['Total Time(us)', 'Call Count', 'Min(us)', 'Max(us)', 'Mean(us)', 'P50(us)', 'P95(us)']
+
+# Row patterns, used to learn the column layout and for rows that do not fit it
+DRIVERS_PATTERN = re.compile(r'\d+:  \[.\S*?\]\s+(.*?)\s{4,}(.*)\s+(\d+)')
+GENERAL_PATTERN = re.compile(r'\s*\d+:\s*(.*?)\s{4,}(.*?)\s+(\d+)')
+
+# Blanks in front of a column start, and the rows voting on where the description column starts
+COLUMN_GAP = '  '
+LEARN_ROWS = 16
+
+# Opt-in per-call time columns: the first calls of each key, or a histogram of all of them
+TIME_COLUMNS = {'samples': 'Time(us)', 'histogram': 'Time Histogram(us)'}
+DEFAULT_MAX_SAMPLES = 16
 
 # Check for Python 3.x
 if sys.version_info[0] != 3:
     print("This script requires Python 3.x.")
     sys.exit(1)
 
-def process_peims_data(input_file, output_md_file='output.md'):
-    # Read the data
-    with open(input_file, 'r') as file:
-        lines = file.readlines()
-
+def parse_peims_data(lines):
     # Clean the data, removing the Index and Token columns
-    data = []
     for line in lines:
         # Skip header lines and separators
         if line.startswith('Index') or '----' in line or line.startswith('==['):
             continue
-        
+
         # Use regular expression to extract Instance GUID and Time(us)
         match = re.match(r'\s*\d+:\s+(\S+)\s+\S+\s+(\d+)', line.strip())
         if match:
             instance_guid = match.group(1).strip()
             time_us = int(match.group(2).strip())
-            data.append([instance_guid, time_us])
-    
-    # Merge rows with the same Instance GUID
-    merged_data = defaultdict(lambda: [0, 0, []])  # [Total Time, Merge Count, Original Times]
-    for instance_guid, time_us in data:
-        merged_data[instance_guid][0] += time_us
-        merged_data[instance_guid][1] += 1
-        merged_data[instance_guid][2].append(time_us)
-    
-    # Convert the results to a list and sort by Total Time(us)
-    sorted_data = sorted(merged_data.items(), key=lambda x: x[1][0], reverse=True)
-    
-    # Output as Markdown table
-    with open(output_md_file, 'w') as file:
-        file.write('| Instance GUID | Total Time(us) | Call Count | Time(us) |\n')
-        file.write('|---------------|----------------|-------------|----------|\n')
-        for instance_guid, (total_time_us, merge_count, times) in sorted_data:
-            times_str = ', '.join(map(str, times))
-            file.write(f'| {instance_guid} | {total_time_us} | {merge_count} | {times_str} |\n')
-    
-    print(f'Markdown file saved to: {output_md_file}')
+            yield PeimEntry(instance_guid, time_us)
 
-def process_drivers_data(input_file, output_md_file='output.md'):
-    # Read the data
-    with open(input_file, 'r') as file:
-        lines = file.readlines()
+def split_time(line):
+    """Split the right-aligned time field off a row; returns (time start, time) or (None, None)."""
+    row = line.rstrip()
+    time_start = row.rfind(' ') + 1
+    time_text = row[time_start:]
+    if time_start == 0 or not time_text.isdigit():
+        return None, None
+    return time_start, int(time_text)
 
-    # Clean the data, removing unnecessary rows and columns
-    data = []
+def column_starts(line, start, end):
+    """Offsets from start of every column in line[start:end], a column starting after a gap of blanks."""
+    starts = []
+    position = line.find(COLUMN_GAP, start, end)
+    while position >= 0:
+        column = position + len(COLUMN_GAP)
+        while column < end and line[column] == ' ':
+            column += 1
+        if column < end:
+            starts.append(column - start)
+        position = line.find(COLUMN_GAP, column, end)
+    return starts
+
+def learn_description_offset(lines, prefix_char):
+    """Offset of the description column from the prefix end, voted on by the column starts of several rows.
+
+    A name holding a run of blanks adds a column start of its own, but only
+    in its row; the description column starts at the same offset in every
+    row, so the offset most rows share wins (the leftmost one on a tie).
+    """
+    votes = Counter()
     for line in lines:
-        # Skip header lines and separators
-        if line.startswith('Index:') or 'Handle' in line or '----' in line:
-            continue
-        
+        prefix_end = line.find(prefix_char)
+        time_start, _ = split_time(line)
+        if prefix_end > 0 and time_start is not None and line[:line.find(':')].lstrip().isdigit():
+            votes.update(column_starts(line, prefix_end + 1, time_start - 1))
+    if not votes:
+        return None
+    return max(votes.items(), key=lambda vote: (vote[1], -vote[0]))[0] + 1
+
+def parse_fixed_columns(lines, pattern, prefix_char, entry_type):
+    """Split (name, description, time) rows of a fixed-width Dp table in linear time.
+
+    Dp pads the name and description to fixed widths after the index (and
+    handle) prefix, whose own width varies with the index, and right-aligns
+    the time. The time is taken from the right edge of each row, and the
+    offset of the description column from the end of the prefix is learned
+    from the first LEARN_ROWS rows (see learn_description_offset), so names
+    and descriptions may contain runs of blanks. Rows that do not fit the
+    layout fall back to the pattern.
+    """
+    lines = iter(lines)
+    learning = list(islice(lines, LEARN_ROWS))
+    description_offset = learn_description_offset(learning, prefix_char)
+    for line in chain(learning, lines):
+        prefix_end = line.find(prefix_char)
+        if description_offset is not None and prefix_end > 0:
+            description_start = prefix_end + description_offset
+            time_start, time_us = split_time(line)
+            # The description column must start right after blanks, and the row must start with its index
+            if (time_start is not None and description_start < time_start
+                    and line.startswith(COLUMN_GAP, description_start - len(COLUMN_GAP))
+                    and line[:line.find(':')].lstrip().isdigit()):
+                yield entry_type(line[prefix_end + 1:description_start].strip(), line[description_start:time_start].strip(), time_us)
+                continue
+
+        match = pattern.match(line.strip())
+        if match:
+            yield entry_type(match.group(1).strip(), match.group(2).strip(), int(match.group(3)))
+
+def parse_drivers_data(lines, fixed_columns=True):
+    # Clean the data, removing unnecessary rows and columns
+    # Skip header lines and separators
+    rows = (line for line in lines if not (line.startswith('Index:') or 'Handle' in line or '----' in line))
+    if fixed_columns:
+        # Not faster than the pattern on Drivers rows, but it keeps names with blanks and names filling their column
+        yield from parse_fixed_columns(rows, DRIVERS_PATTERN, ']', DriverEntry)
+        return
+
+    for line in rows:
         # Use regular expression to split Driver Name and Description
-        match = re.match(r'\d+:  \[.\S*?\]\s+(.*?)\s{4,}(.*)\s+(\d+)', line.strip())
+        match = DRIVERS_PATTERN.match(line.strip())
         if match:
             driver_name = match.group(1).strip()
             description = match.group(2).strip()
             time_us = int(match.group(3).strip())
-            data.append([driver_name, description, time_us])
-    
-    # Merge rows with the same Driver Name and Description
-    merged_data = defaultdict(lambda: [0, 0, []])  # [Total Time, Merge Count, Original Times]
-    for driver_name, description, time_us in data:
-        merged_data[(driver_name, description)][0] += time_us
-        merged_data[(driver_name, description)][1] += 1
-        merged_data[(driver_name, description)][2].append(time_us)
-    
-    # Convert the results to a list and sort by Total Time(us)
-    sorted_data = sorted(merged_data.items(), key=lambda x: x[1][0], reverse=True)
-    
-    # Output as Markdown table
-    with open(output_md_file, 'w') as file:
-        file.write('| Driver Name | Description | Total Time(us) | Call Count | Time(us) |\n')
-        file.write('|-------------|-------------|----------------|-------------|----------|\n')
-        for (driver_name, description), (total_time_us, merge_count, times) in sorted_data:
-            times_str = ', '.join(map(str, times))
-            file.write(f'| {driver_name} | {description} | {total_time_us} | {merge_count} | {times_str} |\n')
-    
-    print(f'Markdown file saved to: {output_md_file}')
-
-def process_general_data(input_file, output_md_file='output.md'):
-    # Read the data
-    with open(input_file, 'r') as file:
-        lines = file.readlines()
+            yield DriverEntry(driver_name, description, time_us)
 
+def parse_general_data(lines, fixed_columns=True):
     # Clean the data, removing the Index column
-    data = []
-    for line in lines:
-        # Skip header lines and separators
-        if line.startswith('Index') or '----' in line:
-            continue
-        
+    # Skip header lines and separators
+    rows = (line for line in lines if not (line.startswith('Index') or '----' in line))
+    if fixed_columns:
+        yield from parse_fixed_columns(rows, GENERAL_PATTERN, ':', GeneralEntry)
+        return
+
+    for line in rows:
         # Use regular expression to extract Name, Description, and Time(us)
-        match = re.match(r'\s*\d+:\s*(.*?)\s{4,}(.*?)\s+(\d+)', line.strip())
+        match = GENERAL_PATTERN.match(line.strip())
         if match:
             name = match.group(1).strip()
             description = match.group(2).strip()
             time_us = int(match.group(3).strip())
-            data.append([name, description, time_us])
-    
-    # Merge rows with the same Name and Description
-    merged_data = defaultdict(lambda: [0, 0, []])  # [Total Time, Merge Count, Original Times]
-    for name, description, time_us in data:
-        merged_data[(name, description)][0] += time_us
-        merged_data[(name, description)][1] += 1
-        merged_data[(name, description)][2].append(time_us)
-    
-    # Convert the results to a list and sort by Total Time(us)
-    sorted_data = sorted(merged_data.items(), key=lambda x: x[1][0], reverse=True)
-    
-    # Output as Markdown table
-    with open(output_md_file, 'w') as file:
-        file.write('| Name | Description | Total Time(us) | Call Count | Time(us) |\n')
-        file.write('|------|-------------|----------------|-------------|----------|\n')
-        for (name, description), (total_time_us, merge_count, times) in sorted_data:
-            times_str = ', '.join(map(str, times))
-            file.write(f'| {name} | {description} | {total_time_us} | {merge_count} | {times_str} |\n')
-    
-    print(f'Markdown file saved to: {output_md_file}')
+            yield GeneralEntry(name, description, time_us)
 
-def process_major_data(input_file, output_md_file='output.md'):
-    # Read the data
-    with open(input_file, 'r') as file:
-        lines = file.readlines()
-    
+def parse_major_data(lines):
     # Define a dictionary to store the durations
     durations = {
         'Reset End': None,
@@ -144,10 +160,10 @@ def process_major_data(input_file, output_md_file='output.md'):
         'BDS Phase Duration': None,
         'Total Duration': None
     }
-    
+
     # Regular expressions to match values
     value_pattern = re.compile(r'(\d+)\s*\(?(us|ms)?\)?')
-    
+
     # Parse the durations from the lines
     for line in lines:
         line = line.strip()
@@ -155,7 +171,7 @@ def process_major_data(input_file, output_md_file='output.md'):
         if match:
             value = int(match.group(1))
             unit = match.group(2)
-            
+
             if 'Reset End' in line:
                 durations['Reset End'] = value
             elif 'SEC Phase Duration' in line:
@@ -169,47 +185,215 @@ def process_major_data(input_file, output_md_file='output.md'):
             elif 'Total       Duration' in line:
                 durations['Total Duration'] = value * 1000 if unit == 'ms' else value
 
-    # Convert the results to a list
-    data = [
-        ['Reset End', durations['Reset End']],
-        ['SEC Phase Duration', durations['SEC Phase Duration']],
-        ['PEI Phase Duration', durations['PEI Phase Duration']],
-        ['DXE Phase Duration', durations['DXE Phase Duration']],
-        ['BDS Phase Duration', durations['BDS Phase Duration']],
-        ['Total Duration', durations['Total Duration']]
-    ]
-    
+    return [MajorPhase(phase, duration) for phase, duration in durations.items()]
+
+def build_major_table(phases):
+    # Major phases are already one row per phase, nothing to merge
+    return SectionTable('Major', {
+        'Phase': [phase.phase for phase in phases],
+        'Duration (us)': [phase.duration_us for phase in phases]
+    })
+
+def group_statistics(codes, times):
+    """Grouped reduction of times by integer key code.
+
+    codes and times are equal-length int64 arrays and codes must cover
+    0..n_keys-1. Returns {column: array} indexed by key code.
+    """
+    import numpy as np
+
+    # Sort by key, then by time inside each key, so every group is a sorted run
+    order = np.lexsort((times, codes))
+    sorted_codes = codes[order]
+    sorted_times = times[order]
+
+    # Start offset and length of each group's run
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    counts = np.diff(np.r_[starts, len(sorted_times)])
+
+    total = np.add.reduceat(sorted_times, starts)
+    stats = {
+        'Total Time(us)': total,
+        'Call Count': counts,
+        'Min(us)': sorted_times[starts],
+        'Max(us)': sorted_times[starts + counts - 1],
+        'Mean(us)': np.round(total / counts, 1)
+    }
+
+    # Percentiles by linear interpolation between the closest ranks of each run
+    for column, quantile in (('P50(us)', 0.50), ('P95(us)', 0.95)):
+        position = (counts - 1) * quantile
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        low_values = sorted_times[starts + lower]
+        high_values = sorted_times[starts + upper]
+        stats[column] = np.round(low_values + (high_values - low_values) * (position - lower), 1)
+    return stats
+
+def sample_column(codes, times, n_keys, max_samples=DEFAULT_MAX_SAMPLES):
+    """Render the first max_samples times of each key in call order, indexed by key code."""
+    import numpy as np
+
+    # A stable sort by key keeps every key's calls in one contiguous run, in call order
+    sorted_times = times[np.argsort(codes, kind='stable')]
+    counts = np.bincount(codes, minlength=n_keys)
+    starts = np.cumsum(counts) - counts
+
+    column = []
+    for start, count in zip(starts.tolist(), counts.tolist()):
+        shown = ', '.join(map(str, sorted_times[start:start + min(count, max_samples)].tolist()))
+        column.append(shown if count <= max_samples else f"{shown}, ... (+{count - max_samples} more)")
+    return column
+
+def histogram_column(codes, times, n_keys):
+    """Count each key's calls in fixed power-of-two bins [0, 2), [2, 4), [4, 8) ..., indexed by key code."""
+    import numpy as np
+
+    bins = np.floor(np.log2(np.maximum(times, 1))).astype(np.int64)
+    n_bins = int(bins.max()) + 1
+    counts = np.bincount(codes * n_bins + bins, minlength=n_keys * n_bins).reshape(n_keys, n_bins)
+
+    labels = [f"{0 if b == 0 else 2 ** b}-{2 ** (b + 1)}" for b in range(n_bins)]
+    return [' '.join(f"{labels[b]}:{row[b]}" for b in np.flatnonzero(row).tolist()) for row in counts.tolist()]
+
+def merge_data(section, entries, time_column=None, max_samples=DEFAULT_MAX_SAMPLES):
+    """Merge entries by key into a SectionTable with per-key statistics.
+
+    time_column adds a bounded per-call column: 'samples' lists the first
+    max_samples times of each key, 'histogram' counts its calls per
+    power-of-two bin.
+    """
+    import numpy as np
+
+    if isinstance(entries, CodedEntries):
+        return merge_codes(section, entries.keys, entries.codes, entries.times, time_column, max_samples)
+
+    # Map each key (every field except the trailing time_us) to an integer code
+    key_codes = {}
+    codes = array('q')
+    times = array('q')
+    for *key, time_us in entries:
+        codes.append(key_codes.setdefault(tuple(key), len(key_codes)))
+        times.append(time_us)
+    return merge_codes(section, list(key_codes), np.frombuffer(codes, dtype=np.int64), np.frombuffer(times, dtype=np.int64),
+                       time_column, max_samples)
+
+def merge_codes(section, keys, codes, times, time_column=None, max_samples=DEFAULT_MAX_SAMPLES):
+    """Merge int64 times by key code into a SectionTable (see merge_data).
+
+    keys lists the key tuple of each code, in first-seen order.
+    """
+    import numpy as np
+
+    key_columns = SECTION_KEYS[section]
+    if not keys:
+        columns = {column: [] for column in key_columns}
+        columns.update({column: np.empty(0, dtype=np.int64) for column in STATISTIC_COLUMNS})
+        if time_column:
+            columns[TIME_COLUMNS[time_column]] = []
+        return SectionTable(section, columns)
+
+    # Merge rows with the same key in one vectorized pass
+    stats = group_statistics(codes, times)
+
+    # Sort by Total Time(us), keeping first-seen order for ties
+    order = np.argsort(-stats['Total Time(us)'], kind='stable')
+    columns = {column: [keys[code][index] for code in order] for index, column in enumerate(key_columns)}
+    columns.update({column: stats[column][order] for column in STATISTIC_COLUMNS})
+    if time_column == 'samples':
+        rendered = sample_column(codes, times, len(keys), max_samples)
+    elif time_column == 'histogram':
+        rendered = histogram_column(codes, times, len(keys))
+    if time_column:
+        columns[TIME_COLUMNS[time_column]] = [rendered[code] for code in order]
+    return SectionTable(section, columns)
+
+def write_markdown_table(table, output_md_file):
     # Output as Markdown table
+    columns = table.column_names
     with open(output_md_file, 'w') as file:
-        file.write('| Phase | Duration (us) |\n')
-        file.write('|-------|---------------|\n')
-        for phase, duration in data:
-            file.write(f'| {phase} | {duration} |\n')
-    
+        file.write('| ' + ' | '.join(columns) + ' |\n')
+        file.write('|' + '|'.join('-' * (len(column) + 2) for column in columns) + '|\n')
+        for row in table.rows():
+            file.write('| ' + ' | '.join(map(str, row)) + ' |\n')
+
     print(f'Markdown file saved to: {output_md_file}')
 
-def determine_and_process_file(input_file, output_md_file='output.md'):
+def process_entries(section, entries, time_column=None, max_samples=DEFAULT_MAX_SAMPLES):
+    """Merge the parsed records of one Dp section into a SectionTable (see merge_data for time_column)."""
+    if section == 'Major':
+        return build_major_table(entries)
+    elif section in ('PEIMs', 'Drivers', 'General'):
+        return merge_data(section, entries, time_column, max_samples)
+    raise ValueError(f"Unknown section: {section}")
+
+def parse_section(section, lines):
+    """Parse the lines of one Dp section into a stream of its records."""
+    if section == 'Major':
+        return parse_major_data(lines)
+    elif section == 'PEIMs':
+        return parse_peims_data(lines)
+    elif section == 'Drivers':
+        return parse_drivers_data(lines)
+    elif section == 'General':
+        return parse_general_data(lines)
+    raise ValueError(f"Unknown section: {section}")
+
+def process_section(section, lines, time_column=None, max_samples=DEFAULT_MAX_SAMPLES):
+    """Parse and merge the lines of one Dp section into a SectionTable (see merge_data for time_column)."""
+    return process_entries(section, parse_section(section, lines), time_column, max_samples)
+
+def read_lines(input_file):
+    # Read the data
     with open(input_file, 'r') as file:
-        first_line = file.readline().strip()
-    
+        return file.readlines()
+
+def process_peims_data(input_file, output_md_file='output.md'):
+    write_markdown_table(process_section('PEIMs', read_lines(input_file)), output_md_file)
+
+def process_drivers_data(input_file, output_md_file='output.md'):
+    write_markdown_table(process_section('Drivers', read_lines(input_file)), output_md_file)
+
+def process_general_data(input_file, output_md_file='output.md'):
+    write_markdown_table(process_section('General', read_lines(input_file)), output_md_file)
+
+def process_major_data(input_file, output_md_file='output.md'):
+    write_markdown_table(process_section('Major', read_lines(input_file)), output_md_file)
+
+def detect_section(first_line):
+    """Return the section name matching the first line of a section, or None."""
     # Check for PEIMs format
     if "Instance GUID" in first_line:
-        process_peims_data(input_file, output_md_file)
+        return 'PEIMs'
     # Check for Drivers format
     elif "Driver Name" in first_line:
-        process_drivers_data(input_file, output_md_file)
+        return 'Drivers'
     elif "Name" in first_line:
-        process_general_data(input_file, output_md_file)
+        return 'General'
     elif "Reset End" in first_line:
-        process_major_data(input_file, output_md_file)
-    else:
+        return 'Major'
+    return None
+
+def determine_and_process_file(input_file, output_md_file='output.md', time_column=None, max_samples=DEFAULT_MAX_SAMPLES):
+    lines = read_lines(input_file)
+    section = detect_section(lines[0].strip() if lines else '')
+    if section is None:
         print("The input file format is not recognized.")
         sys.exit(1)
 
+    write_markdown_table(process_section(section, lines, time_column, max_samples), output_md_file)
+
+def add_time_column_arguments(parser):
+    """Add the opt-in per-call time column options shared by the command-line scripts."""
+    parser.add_argument('--time_column', choices=list(TIME_COLUMNS), default=None,
+                        help='Add a per-call time column: the first --max_samples times of each entry, or a power-of-two histogram of all of them')
+    parser.add_argument('--max_samples', type=int, default=DEFAULT_MAX_SAMPLES, help=f'Times listed per entry with --time_column samples (default: {DEFAULT_MAX_SAMPLES})')
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Process data from a TXT file and output to a Markdown file.')
     parser.add_argument('input_file', type=str, help='Input TXT file with data')
     parser.add_argument('--output_md_file', type=str, default='output.md', help='Output Markdown file (default: output.md)')
-    
+    add_time_column_arguments(parser)
+
     args = parser.parse_args()
-    determine_and_process_file(args.input_file, args.output_md_file)
+    determine_and_process_file(args.input_file, args.output_md_file, args.time_column, args.max_samples)
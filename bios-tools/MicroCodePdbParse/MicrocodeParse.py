@@ -1,6 +1,7 @@
 import struct
 import sys
 import os
+import mmap
 from collections import namedtuple
 
 # Define the structures according to the given format
@@ -8,6 +9,8 @@ from collections import namedtuple
 CPUMicrocodeDate = namedtuple('CPUMicrocodeDate', ['Year', 'Day', 'Month'])
 CPUMicrocodeProcessorSignature = namedtuple('CPUMicrocodeProcessorSignature', ['Stepping', 'Model', 'Family', 'Type', 'Reserved1', 'ExtendedModel', 'ExtendedFamily', 'Reserved2'])
 CPUMicrocodeHeader = namedtuple('CPUMicrocodeHeader', ['HeaderVersion', 'UpdateRevision', 'Date', 'ProcessorSignature', 'Checksum', 'LoaderRevision', 'ProcessorFlags', 'DataSize', 'TotalSize', 'Reserved'])
+CPUMicrocodeExtendedSignature = namedtuple('CPUMicrocodeExtendedSignature', ['ProcessorSignature', 'ProcessorFlags', 'Checksum'])
+CPUMicrocodeUpdate = namedtuple('CPUMicrocodeUpdate', ['Offset', 'Header', 'ExtendedChecksum', 'ExtendedSignatures'])
 
 def check_python_version():
     if sys.version_info < (3, 6):
@@ -22,50 +25,111 @@ def format_size(size_in_bytes):
     else:
         return "{:d} B".format(size_in_bytes)
 
+# Update header: nine DWORDs and 12 reserved bytes
+HEADER_STRUCT = struct.Struct('<9I12s')
+HEADER_SIZE = HEADER_STRUCT.size
+
+# Extended signature table header (count, checksum, 12 reserved bytes) and its 12-byte entries
+EXTENDED_TABLE_STRUCT = struct.Struct('<II12s')
+EXTENDED_SIGNATURE_STRUCT = struct.Struct('<III')
+
+# A DataSize (TotalSize) of 0 means the legacy fixed 2000 (2048) byte update
+DEFAULT_DATA_SIZE = 2000
+DEFAULT_TOTAL_SIZE = 2048
+
+def parse_date(value):
+    return CPUMicrocodeDate(
+        Year=value & 0xFFFF,
+        Day=(value >> 16) & 0xFF,
+        Month=(value >> 24) & 0xFF
+    )
+
+def parse_processor_signature(value):
+    return CPUMicrocodeProcessorSignature(
+        Stepping=value & 0xF,
+        Model=(value >> 4) & 0xF,
+        Family=(value >> 8) & 0xF,
+        Type=(value >> 12) & 0x3,
+        Reserved1=(value >> 14) & 0x3,
+        ExtendedModel=(value >> 16) & 0xF,
+        ExtendedFamily=(value >> 20) & 0xFF,
+        Reserved2=(value >> 28) & 0xF
+    )
+
+def parse_header(buffer, offset=0):
+    unpacked_data = HEADER_STRUCT.unpack_from(buffer, offset)
+    return CPUMicrocodeHeader(
+        HeaderVersion=unpacked_data[0],
+        UpdateRevision=unpacked_data[1],
+        Date=parse_date(unpacked_data[2]),
+        ProcessorSignature=parse_processor_signature(unpacked_data[3]),
+        Checksum=unpacked_data[4],
+        LoaderRevision=unpacked_data[5],
+        ProcessorFlags=unpacked_data[6],
+        DataSize=unpacked_data[7],
+        TotalSize=unpacked_data[8],
+        Reserved=unpacked_data[9]
+    )
+
+def parse_extended_signatures(buffer, offset, end):
+    """Decode the extended signature table at offset; returns (checksum, [CPUMicrocodeExtendedSignature])."""
+    if offset + EXTENDED_TABLE_STRUCT.size > end:
+        return None, []
+    count, checksum, _ = EXTENDED_TABLE_STRUCT.unpack_from(buffer, offset)
+    offset += EXTENDED_TABLE_STRUCT.size
+    count = min(count, (end - offset) // EXTENDED_SIGNATURE_STRUCT.size)
+    signatures = []
+    for index in range(count):
+        signature, flags, entry_checksum = EXTENDED_SIGNATURE_STRUCT.unpack_from(buffer, offset + index * EXTENDED_SIGNATURE_STRUCT.size)
+        signatures.append(CPUMicrocodeExtendedSignature(parse_processor_signature(signature), flags, entry_checksum))
+    return checksum, signatures
+
+def iter_microcode_updates(buffer):
+    """Walk every update of a buffer of concatenated microcode updates by TotalSize.
+
+    Only headers and extended signature tables are decoded, straight from the
+    buffer; payloads are never copied. Stops at the end of the buffer or at
+    trailing padding (anything whose HeaderVersion is not 1).
+    """
+    offset = 0
+    end = len(buffer)
+    while offset + HEADER_SIZE <= end:
+        header = parse_header(buffer, offset)
+        if header.HeaderVersion != 1:
+            break
+        data_size = header.DataSize or DEFAULT_DATA_SIZE
+        total_size = header.TotalSize or DEFAULT_TOTAL_SIZE
+        if total_size < HEADER_SIZE + data_size or offset + total_size > end:
+            print(f"Warning: Update at offset 0x{offset:X} has an invalid TotalSize 0x{total_size:X}, stopping.")
+            break
+
+        extended_checksum, extended_signatures = None, []
+        if total_size > HEADER_SIZE + data_size:
+            extended_checksum, extended_signatures = parse_extended_signatures(buffer, offset + HEADER_SIZE + data_size, offset + total_size)
+        yield CPUMicrocodeUpdate(offset, header, extended_checksum, extended_signatures)
+        offset += total_size
+
+def iter_pdb_file(file_path):
+    """Memory-map a PDB file and lazily yield a CPUMicrocodeUpdate per update it holds."""
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer = memoryview(mapped)
+            try:
+                yield from iter_microcode_updates(buffer)
+            finally:
+                # The map cannot be closed while a view of it is alive
+                buffer.release()
+
 # Function to parse the PDB file
 def parse_pdb_file(file_path):
+    """Return the header at the start of the PDB file, valid or not, or None if the file is shorter than a header."""
     with open(file_path, 'rb') as file:
-        # Read the binary data
-        data = file.read()
-        
-        # Unpack the header
-        header_format = '<I I I I I I I I I I I I 12s'
-        unpacked_data = struct.unpack_from(header_format, data)
-        
-        # Parse the Date field
-        date = CPUMicrocodeDate(
-            Year=(unpacked_data[2]) & 0xFFFF,
-            Day=(unpacked_data[2] >> 16) & 0xFF,
-            Month=(unpacked_data[2] >> 24) & 0xFF
-        )
-        
-        # Parse the ProcessorSignature field
-        processor_signature = CPUMicrocodeProcessorSignature(
-            Stepping=unpacked_data[3] & 0xF,
-            Model=(unpacked_data[3] >> 4) & 0xF,
-            Family=(unpacked_data[3] >> 8) & 0xF,
-            Type=(unpacked_data[3] >> 12) & 0x3,
-            Reserved1=(unpacked_data[3] >> 14) & 0x3,
-            ExtendedModel=(unpacked_data[3] >> 16) & 0xF,
-            ExtendedFamily=(unpacked_data[3] >> 20) & 0xFF,
-            Reserved2=(unpacked_data[3] >> 28) & 0xF
-        )
-        
-        # Create the CPUMicrocodeHeader
-        header = CPUMicrocodeHeader(
-            HeaderVersion=unpacked_data[0],
-            UpdateRevision=unpacked_data[1],
-            Date=date,
-            ProcessorSignature=processor_signature,
-            Checksum=unpacked_data[4],
-            LoaderRevision=unpacked_data[5],
-            ProcessorFlags=unpacked_data[6],
-            DataSize=unpacked_data[7],
-            TotalSize=unpacked_data[8],
-            Reserved=unpacked_data[9]
-        )
-        
-        return header
+        data = file.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        return None
+    return parse_header(data)
 
 def print_microcode_header(header):
     print("CPUMicrocodeHeader:")
@@ -89,9 +153,32 @@ def print_microcode_header(header):
     print("DataSize           = 0x{:08X} ({})".format(header.DataSize, format_size(header.DataSize)))
     print("TotalSize          = 0x{:08X} ({})".format(header.TotalSize, format_size(header.TotalSize)))
 
+def print_extended_signatures(update):
+    print("ExtendedSignatureTable:")
+    print("  ExtendedChecksum = 0x{:08X}".format(update.ExtendedChecksum))
+    for index, signature in enumerate(update.ExtendedSignatures):
+        processor_signature = signature.ProcessorSignature
+        print("  [{}] Family 0x{:X} Model 0x{:X} Stepping 0x{:X} ExtendedFamily 0x{:02X} ExtendedModel 0x{:X}, ProcessorFlags = 0x{:08X}, Checksum = 0x{:08X}".format(
+            index, processor_signature.Family, processor_signature.Model, processor_signature.Stepping,
+            processor_signature.ExtendedFamily, processor_signature.ExtendedModel, signature.ProcessorFlags, signature.Checksum))
+
 def process_pdb_file(file_path):
-    microcode_header = parse_pdb_file(file_path)
-    print_microcode_header(microcode_header)
+    count = 0
+    for update in iter_pdb_file(file_path):
+        count += 1
+        print(f"\nUpdate {count} at offset 0x{update.Offset:X}:")
+        print_microcode_header(update.Header)
+        if update.ExtendedChecksum is not None:
+            print_extended_signatures(update)
+    if count == 0:
+        print(f"No microcode update found in {file_path}.")
+        # Still show what the file starts with, for inspecting a damaged or foreign file
+        header = parse_pdb_file(file_path)
+        if header is not None:
+            print("\nInvalid header at offset 0x0 (HeaderVersion must be 1 and TotalSize must fit the file):")
+            print_microcode_header(header)
+    else:
+        print(f"\n{count} microcode update(s) in {file_path}.")
 
 def process_folder(folder_path):
     for filename in os.listdir(folder_path):